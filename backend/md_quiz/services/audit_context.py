@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from contextlib import contextmanager
 import contextvars
-from typing import Any, Iterator
+from typing import Any, Iterator, Mapping
 
 
 _AUDIT_CTX: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("audit_ctx", default={})
@@ -38,6 +38,14 @@ def get_audit_context() -> dict[str, Any]:
     return dict(v or {})
 
 
+def peek_audit_context() -> Mapping[str, Any]:
+    """
+    Read-only view of the current audit context, without the copy made by get_audit_context().
+    Contexts are replaced (never mutated) on set, so the snapshot stays consistent for the caller.
+    """
+    return _AUDIT_CTX.get()
+
+
 def add_audit_meta(meta: dict[str, Any] | None = None, /, **kwargs: Any) -> None:
     """
     Merge fields into current audit context's meta dict.
@@ -74,9 +82,9 @@ def incr_audit_meta_int(key: str, delta: int | None) -> None:
     ctx = get_audit_context()
     if not ctx:
         return
+    # Copy before writing: the nested meta dict is shared with earlier snapshots (see peek_audit_context).
     meta = ctx.get("meta")
-    if not isinstance(meta, dict):
-        meta = {}
+    meta = dict(meta) if isinstance(meta, dict) else {}
     try:
         cur = int(meta.get(key) or 0)
     except Exception:
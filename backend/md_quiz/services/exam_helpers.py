@@ -63,6 +63,8 @@ _FENCED_BLOCK_RE = re.compile(r"^\s*(```|~~~)")
 _HORIZONTAL_RULE_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
 _TRAILING_HARD_BREAK_RE = re.compile(r"(?:\\|[ \t]{2,})\s*$")
 _FILENAME_UNSAFE_RE = re.compile(r'[\\\\/:*?"<>|]+')
+# Math can only start at `$` or `\`; everything between those is copied through as one slice.
+_MATH_DELIM_START_RE = re.compile(r"[$\\]")
 _PUBLIC_INVITE_GUARD = threading.Lock()
 _MARKDOWN_EXTENSIONS = [
     "markdown.extensions.fenced_code",
@@ -179,65 +181,56 @@ def _protect_math_for_markdown(raw: str) -> tuple[str, list[tuple[str, str]]]:
             j -= 1
         return (bs % 2) == 1
 
+    def find_unescaped(needle: str, start: int) -> int:
+        k = text.find(needle, start)
+        while k >= 0 and is_escaped(k):
+            k = text.find(needle, k + 1)
+        return k
+
+    def protect(seg: str) -> None:
+        token = f"@@MATH{len(replacements)}@@"
+        replacements.append((token, html.escape(seg, quote=False)))
+        out.append(token)
+
     i = 0
     while i < len(text):
+        m = _MATH_DELIM_START_RE.search(text, i)
+        if m is None:
+            out.append(text[i:])
+            break
+        if m.start() > i:
+            out.append(text[i : m.start()])
+            i = m.start()
+
         if text.startswith("$$", i) and not is_escaped(i):
-            j = i + 2
-            while True:
-                k = text.find("$$", j)
-                if k < 0:
-                    break
-                if not is_escaped(k):
-                    seg = text[i : k + 2]
-                    token = f"@@MATH{len(replacements)}@@"
-                    replacements.append((token, html.escape(seg, quote=False)))
-                    out.append(token)
-                    i = k + 2
-                    break
-                j = k + 1
-            else:
-                # Unreachable; keep structure explicit.
-                pass
-            if i != j and out and out[-1].startswith("@@MATH"):
+            k = find_unescaped("$$", i + 2)
+            if k >= 0:
+                protect(text[i : k + 2])
+                i = k + 2
                 continue
 
         if text.startswith("\\[", i):
             k = text.find("\\]", i + 2)
             if k >= 0:
-                seg = text[i : k + 2]
-                token = f"@@MATH{len(replacements)}@@"
-                replacements.append((token, html.escape(seg, quote=False)))
-                out.append(token)
+                protect(text[i : k + 2])
                 i = k + 2
                 continue
 
         if text.startswith("\\(", i):
             k = text.find("\\)", i + 2)
             if k >= 0:
-                seg = text[i : k + 2]
-                token = f"@@MATH{len(replacements)}@@"
-                replacements.append((token, html.escape(seg, quote=False)))
-                out.append(token)
+                protect(text[i : k + 2])
                 i = k + 2
                 continue
 
         if text[i] == "$" and not is_escaped(i) and not text.startswith("$$", i):
-            j = i + 1
-            while True:
-                k = text.find("$", j)
-                if k < 0:
-                    break
-                if not is_escaped(k):
-                    seg = text[i : k + 1]
-                    token = f"@@MATH{len(replacements)}@@"
-                    replacements.append((token, html.escape(seg, quote=False)))
-                    out.append(token)
-                    i = k + 1
-                    break
-                j = k + 1
-            if out and out[-1].startswith("@@MATH"):
+            k = find_unescaped("$", i + 1)
+            if k >= 0:
+                protect(text[i : k + 1])
+                i = k + 1
                 continue
 
+        # Unmatched delimiter: keep it as plain text.
         out.append(text[i])
         i += 1
 
@@ -4,7 +4,11 @@ import base64
 import json
 import os
 import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
+from itertools import accumulate
 from typing import Any
 
 from backend.md_quiz.config import logger
@@ -18,9 +22,29 @@ from backend.md_quiz.services.llm_client import (
 
 
 _PHONE_RE = re.compile(r"^1[3-9]\d{9}$")
+_PHONE_IN_TEXT_RE = re.compile(r"(?:\+?86[\s-]*)?(1[3-9]\d{9})")
+_NON_DIGIT_RE = re.compile(r"\D+")
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+_BLANK_LINE_RUN_RE = re.compile(r"\n{4,}")
+_BULLET_SPLIT_RE = re.compile(r"[\n\r•·\-–—\u2022]+")
+# Chinese names carry no inner spaces; Latin names may have a few space/dot separated words.
+# A Latin word followed by ":" is the next field's label ("Email:", "Phone:"), never part of the name.
+_LATIN_NAME_SEP = r"[ ·](?![A-Za-z]+\s*[:：])"
+_NAME_LABEL_RE = re.compile(
+    r"(?:^|[\n\r\t ])(?:姓名|Name)\s*[:：]?\s*"
+    r"([\u4e00-\u9fff·]{2,20}|(?![A-Za-z]+\s*[:：])"
+    # Like the CJK branch, the Latin run (up to the next label) must be 2-20 characters long.
+    rf"(?=(?:[A-Za-z]|{_LATIN_NAME_SEP}(?=[A-Za-z])){{2,20}}(?![A-Za-z]|{_LATIN_NAME_SEP}[A-Za-z]))"
+    rf"[A-Za-z]+(?:{_LATIN_NAME_SEP}[A-Za-z]+){{0,2}})",
+    flags=re.IGNORECASE,
+)
+_IDENTITY_HEAD_CHARS = 4096
+_CN_NAME_LINE_RE = re.compile(r"[\u4e00-\u9fff]{2,4}")
+_EN_NAME_LINE_RE = re.compile(r"[A-Za-z][A-Za-z\s·]{1,19}")
+_JSON_DECODER = json.JSONDecoder()
 _FULLWIDTH_DIGITS = str.maketrans("０１２３４５６７８９", "0123456789")
-_NOISE_TOKEN_LINE_HEX_RE = re.compile(r"^[0-9a-fA-F]{24,}$")
-_NOISE_TOKEN_LINE_SAFE_RE = re.compile(r"^[A-Za-z0-9_-]{28,}$")
+# Single fullmatch for both noise token shapes (long hex / base64-ish); whitespace never matches.
+_NOISE_TOKEN_FULL_RE = re.compile(r"[0-9a-fA-F]{24,}|[A-Za-z0-9_-]{28,}")
 _IMAGE_RESUME_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
 _DIRECT_IMAGE_MIME_BY_EXT = {
     ".png": "image/png",
@@ -32,7 +56,7 @@ _DIRECT_IMAGE_MIME_BY_EXT = {
 
 def _normalize_phone(value: str) -> str:
     v = (value or "").strip().translate(_FULLWIDTH_DIGITS)
-    digits = re.sub(r"\D+", "", v)
+    digits = _NON_DIGIT_RE.sub("", v)
     if digits.startswith("0086"):
         digits = digits[4:]
     if digits.startswith("86") and len(digits) >= 13:
@@ -48,23 +72,19 @@ def _normalize_phone(value: str) -> str:
 
 def _guess_phone_from_text(text: str) -> str:
     raw = (text or "").translate(_FULLWIDTH_DIGITS)
-    m = re.search(r"(?:\+?86[\s-]*)?(1[3-9]\d{9})", raw)
+    m = _PHONE_IN_TEXT_RE.search(raw)
     if not m:
         return ""
     return _normalize_phone(m.group(1))
 
 
+def _is_noise_token_stripped(s: str) -> bool:
+    return len(s) >= 24 and _NOISE_TOKEN_FULL_RE.fullmatch(s) is not None
+
+
 def _is_noise_token_line(line: str) -> bool:
-    s = str(line or "").strip()
-    if len(s) < 24:
-        return False
-    if " " in s or "\t" in s:
-        return False
-    if _NOISE_TOKEN_LINE_HEX_RE.fullmatch(s):
-        return True
-    if _NOISE_TOKEN_LINE_SAFE_RE.fullmatch(s):
-        return True
-    return False
+    # Drop repeated long hex/base64-ish garbage lines (common in OCR/PDF extraction artifacts).
+    return _is_noise_token_stripped(str(line or "").strip())
 
 
 def _clean_text_for_llm(text: str) -> str:
@@ -79,16 +99,26 @@ def _clean_text_for_llm(text: str) -> str:
     if not s:
         return ""
 
-    lines = [ln.rstrip() for ln in s.splitlines()]
+    # One pass over the lines: drop noise lines, cap blank runs at two lines (what
+    # `_BLANK_LINE_RUN_RE` -> "\n\n\n" did) and trim blank edges, so the joined text
+    # is final and needs no further strip/sub scans.
     out_lines: list[str] = []
-    for ln in lines:
-        if _is_noise_token_line(ln):
+    blank = 0
+    for ln in s.splitlines():
+        ln = ln.rstrip()
+        if not ln:
+            if out_lines and blank < 2:
+                out_lines.append("")
+            blank += 1
             continue
-        out_lines.append(ln)
-
-    out = "\n".join(out_lines).strip()
-    out = re.sub(r"\n{4,}", "\n\n\n", out).strip()
-    return out
+        # Noise lines are >= 24 chars; skip the call for the (far more common) short lines.
+        if len(ln) >= 24 and _is_noise_token_line(ln):
+            continue
+        out_lines.append(ln if out_lines else ln.lstrip())
+        blank = 0
+    while out_lines and not out_lines[-1]:
+        out_lines.pop()
+    return "\n".join(out_lines)
 
 
 def _extract_image_text_llm(data: bytes, filename: str) -> str:
@@ -228,16 +258,16 @@ def _resume_string(value: Any) -> str:
 
 
 def _resume_unique_str_list(value: Any, *, limit: int = 30) -> list[str]:
-    items: list[str]
     if isinstance(value, list):
-        items = [_resume_string(item) for item in value]
+        parts: list[Any] = value
     elif isinstance(value, str):
-        items = [part.strip() for part in re.split(r"[\n\r•·\-–—\u2022]+", value) if part.strip()]
+        parts = _BULLET_SPLIT_RE.split(value)
     else:
-        items = []
+        return []
     out: list[str] = []
     seen: set[str] = set()
-    for item in items:
+    for part in parts:
+        item = _resume_string(part)
         if not item or item in seen:
             continue
         seen.add(item)
@@ -256,26 +286,41 @@ def _resume_num_or_none(value: Any) -> float | None:
         return None
 
 
-def _normalize_resume_degree(value: Any) -> str:
+_RESUME_DEGREE_MAPPINGS = {
+    "本科": "本科",
+    "学士": "本科",
+    "硕士": "硕士",
+    "研究生": "硕士",
+    "博士": "博士",
+    "大专": "大专",
+    "专科": "大专",
+    "高中": "高中",
+    "中专": "高中",
+    "未知": "未知",
+}
+# Single-character fallbacks for strict mode, checked in order after the full-word mappings.
+_RESUME_DEGREE_HINTS = (("博", "博士"), ("硕", "硕士"), ("本", "本科"), ("专", "大专"), ("高", "高中"))
+
+
+def _normalize_resume_degree(value: Any, *, strict: bool = False) -> str:
+    """
+    Map a free-form degree to the canonical set (本科/硕士/博士/大专/高中/未知).
+
+    The identity parser keeps unrecognised text as-is; with ``strict`` (details parser) empty or
+    unrecognised values become "未知" after also trying single-character hints.
+    """
     text = _resume_string(value)
     if not text:
-        return ""
-    mappings = {
-        "本科": "本科",
-        "学士": "本科",
-        "硕士": "硕士",
-        "研究生": "硕士",
-        "博士": "博士",
-        "大专": "大专",
-        "专科": "大专",
-        "高中": "高中",
-        "中专": "高中",
-        "未知": "未知",
-    }
-    for key, target in mappings.items():
+        return "未知" if strict else ""
+    for key, target in _RESUME_DEGREE_MAPPINGS.items():
         if key in text:
             return target
-    return text
+    if not strict:
+        return text
+    for hint, degree in _RESUME_DEGREE_HINTS:
+        if hint in text:
+            return degree
+    return "未知"
 
 
 def _normalize_resume_gender(value: Any) -> str:
@@ -293,7 +338,7 @@ def _normalize_resume_gender(value: Any) -> str:
 
 
 def _normalize_resume_summary(value: Any) -> str:
-    text = re.sub(r"\s+", " ", _resume_string(value)).strip()
+    text = _WHITESPACE_RUN_RE.sub(" ", _resume_string(value)).strip()
     if not text:
         return ""
     if len(text) > 120:
@@ -303,17 +348,21 @@ def _normalize_resume_summary(value: Any) -> str:
     return text
 
 
+def _loads_llm_json(raw: str) -> Any:
+    """Decode the first JSON object in an LLM reply, ignoring any prose around it."""
+    start = raw.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in LLM output")
+    obj, _end = _JSON_DECODER.raw_decode(raw, start)
+    return obj
+
+
 def _parse_llm_json_object(raw: str, *, label: str) -> dict[str, Any]:
     text = str(raw or "").strip()
     if not text:
         raise RuntimeError(f"{label} 返回为空")
-    if not (text.startswith("{") and text.endswith("}")):
-        left = text.find("{")
-        right = text.rfind("}")
-        if left != -1 and right != -1 and right > left:
-            text = text[left : right + 1]
     try:
-        obj = json.loads(text)
+        obj = _loads_llm_json(text)
     except Exception as exc:
         logger.warning("%s output parse failed: %r", label, raw[:400])
         raise RuntimeError(f"{label} 输出不是有效 JSON") from exc
@@ -409,7 +458,7 @@ def _normalize_resume_details_from_obj(obj: dict[str, Any]) -> dict[str, Any]:
                 "kind": kind,
                 "title": _resume_string(item.get("title")),
                 "period": _resume_string(item.get("period")),
-                "body": re.sub(r"\n{4,}", "\n\n\n", _resume_string(item.get("body"))).strip(),
+                "body": _BLANK_LINE_RUN_RE.sub("\n\n\n", _resume_string(item.get("body"))).strip(),
             }
             if row["title"] or row["body"]:
                 normalized_blocks.append(row)
@@ -644,23 +693,16 @@ def extract_resume_section(
     stops = stop_keywords or []
     lines = s.splitlines()
 
-    def _hit(line: str, keywords: list[str]) -> bool:
-        l = (line or "").strip()
+    section_keywords_lo = tuple(k.lower() for k in (str(kw or "").strip() for kw in section_keywords) if k)
+    stops_lo = tuple(k.lower() for k in (str(kw or "").strip() for kw in stops) if k)
+
+    def _hit(line: str, keywords_lo: tuple[str, ...]) -> bool:
+        # Heading-like matches ("关键词：" at line start) are a subset of the substring match,
+        # which is kept for glued PDF extraction cases; so one lowered substring scan suffices.
+        l = (line or "").strip().lower()
         if not l:
             return False
-        for kw in keywords:
-            k = (kw or "").strip()
-            if not k:
-                continue
-            # Prefer heading-like matches to avoid false positives inside body text.
-            # Still fallback to substring match for glued PDF extraction cases.
-            if re.search(rf"(?i)^\s*{re.escape(k)}\s*[:：\-—]*\s*$", line or ""):
-                return True
-            if re.search(rf"(?i)^\s*{re.escape(k)}\s*[:：\-—]", line or ""):
-                return True
-            if k.lower() in l.lower():
-                return True
-        return False
+        return any(k in l for k in keywords_lo)
 
     def _first_pos_and_kw(line: str, keywords: list[str]) -> tuple[int, str]:
         """
@@ -686,7 +728,7 @@ def extract_resume_section(
     start_idx = -1
     start_kw = ""
     for i, line in enumerate(lines):
-        if _hit(line, section_keywords):
+        if _hit(line, section_keywords_lo):
             start_idx = i
             _p, _kw = _first_pos_and_kw(line, section_keywords)
             start_kw = _kw
@@ -727,7 +769,7 @@ def extract_resume_section(
             end_idx = min(end_idx, start_idx + 1)
         else:
             for j in range(start_idx + 1, len(lines)):
-                if _hit(lines[j], stops):
+                if _hit(lines[j], stops_lo):
                     end_idx = j
                     break
 
@@ -804,6 +846,10 @@ EXPERIENCE_STOP_KEYWORDS = [
     "profile",
     "summary",
 ]
+# Lowered once for the per-line stop test in extract_experience_raw.
+_EXPERIENCE_STOP_KEYWORDS_LOWER = tuple(kw.lower() for kw in EXPERIENCE_STOP_KEYWORDS)
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n[ \t]*\n")
 
 _COMPANY_HINT_RE = re.compile(
     r"(?:有限公司|有限责任公司|集团|科技|信息|数据|银行|证券|保险|股份|研究院|研究所|中心|大学|学院)",
@@ -830,7 +876,7 @@ def _extract_experience_head_fallback(text: str, *, max_chars: int = 7000) -> st
         return ""
 
     # Require at least one time-range and a company-ish hint to avoid pulling unrelated headers.
-    if len(_PROJECT_PERIOD_RANGE_RE.findall(head)) < 1:
+    if _search_project_period(head) is None:
         return ""
     if not _COMPANY_HINT_RE.search(head):
         return ""
@@ -845,7 +891,8 @@ def _extract_experience_head_fallback(text: str, *, max_chars: int = 7000) -> st
             if out_lines and out_lines[-1] != "":
                 out_lines.append("")
             continue
-        if any((kw.lower() in ln.lower()) for kw in EXPERIENCE_STOP_KEYWORDS):
+        ln_lower = ln.lower()
+        if any(kw in ln_lower for kw in _EXPERIENCE_STOP_KEYWORDS_LOWER):
             # stop only if we already captured some experience-like content
             if out_lines:
                 break
@@ -865,27 +912,12 @@ def extract_experience_raw(text: str, *, max_chars: int = 20000) -> str:
     Strategy:
     - Prefer explicit 项目经历/项目经验段落
     - Also include 工作经历段落 because many resumes embed project-like details under work experience
-    - Merge the two sections with conservative de-duplication
+    - Merge the sections paragraph by paragraph in priority order (head fallback > projects > work),
+      skipping sections/paragraphs whose lines all appeared in an earlier section or whose text is
+      already contained in an earlier section's output, and dropping earlier sections whose output
+      a later section encloses (whitespace-insensitive)
     """
 
-    def _norm(s: str) -> str:
-        return re.sub(r"\s+", " ", (s or "").strip())
-
-    def _merge(a: str, b: str) -> str:
-        a2 = (a or "").strip()
-        b2 = (b or "").strip()
-        if not a2:
-            return b2
-        if not b2:
-            return a2
-        na = _norm(a2)
-        nb = _norm(b2)
-        if nb in na:
-            return a2
-        if na in nb:
-            return b2
-        return (a2.rstrip() + "\n\n" + b2).strip()
-
     sec_max = 0 if (not max_chars) or int(max_chars) <= 0 else max(1000, int(max_chars))
 
     proj = ""
@@ -916,10 +948,40 @@ def extract_experience_raw(text: str, *, max_chars: int = 20000) -> str:
     except Exception:
         head_fallback = ""
 
-    merged = _merge(
-        _merge(clean_projects_raw_for_display(head_fallback), clean_projects_raw_for_display(proj)),
-        clean_projects_raw_for_display(work),
-    )
+    # Per emitted section: (paragraphs, line keys, whitespace-normalised emitted text).
+    # Glued single-line PDF text yields the same content as longer/shorter lines per
+    # section, which line keys alone cannot match, hence the normalised text.
+    sections: list[tuple[list[str], set[str], str]] = []
+    for section in (head_fallback, proj, work):
+        cleaned = clean_projects_raw_for_display(section)
+        if not cleaned:
+            continue
+        cleaned_norm = " ".join(cleaned.split())
+        # A later section may enclose an earlier one without a blank line in between
+        # (e.g. 项目经历 nested under 工作经历); keep only the enclosing section.
+        sections = [sec for sec in sections if sec[2] not in cleaned_norm]
+        # Paragraphs are only checked against earlier sections, never their own section.
+        seen = set().union(*(sec[1] for sec in sections))
+        emitted = " ".join(sec[2] for sec in sections)
+        if emitted and cleaned_norm in emitted:
+            continue
+        section_paras: list[str] = []
+        section_keys: set[str] = set()
+        section_norms: list[str] = []
+        for para in _PARAGRAPH_SPLIT_RE.split(cleaned):
+            keys = {" ".join(ln.split()) for ln in para.splitlines()}
+            keys.discard("")
+            if not keys or keys <= seen:
+                continue
+            para_norm = " ".join(para.split())
+            if emitted and para_norm in emitted:
+                continue
+            section_paras.append(para)
+            section_keys |= keys
+            section_norms.append(para_norm)
+        if section_paras:
+            sections.append((section_paras, section_keys, " ".join(section_norms)))
+    merged = "\n\n".join(para for sec in sections for para in sec[0]).strip()
     if not merged:
         return ""
     if max_chars and len(merged) > int(max_chars):
@@ -938,147 +1000,156 @@ def clean_projects_raw_for_display(text: str) -> str:
         return ""
 
     # Remove leading section labels.
-    s = re.sub(
-        r"^\s*(项目经历|项目经验|工作经历|工作经验|WORK EXPERIENCE|Work Experience)\s*[:：\-—]*\s*",
-        "",
-        s,
-        flags=re.IGNORECASE,
-    )
+    s = _SECTION_LABEL_PREFIX_RE.sub("", s)
     # Sometimes PDF extraction glues the label to the next token without spaces/punctuation.
-    for lab in ("项目经历", "项目经验", "工作经历", "工作经验"):
-        if s.startswith(lab):
-            s = s[len(lab) :].lstrip()
-            break
+    if s.startswith(_PROJECT_SECTION_LABELS):
+        s = s[4:].lstrip()  # every label is four characters
 
     # Add line breaks before common labels when they appear inline.
-    # Use a boundary check to avoid splitting longer labels (e.g. "项目成果：" should not become "项目\n成果：").
-    labels = [
-        "内容：",
-        "工作：",
-        "负责：",
-        "职责：",
-        "项目名称：",
-        "项目时间：",
-        "时间：",
-        "技术栈：",
-        "关键词：",
-        "项目成果：",
-        "项目结果：",
-        "成果：",
-        "结果：",
-        "项目描述：",
-        "描述：",
-    ]
-    for lab in labels:
-        s = re.sub(
-            rf"(?<!\n)(?<![\u4e00-\u9fffA-Za-z0-9]){re.escape(lab)}",
-            "\n" + lab,
-            s,
-        )
+    s = _DISPLAY_FIELD_LABEL_RE.sub(r"\n\g<0>", s)
 
     # Ensure each "项目：" starts on its own line (common PDF glue).
-    s = re.sub(r"(?<!\n)\s*(项目)\s*[:：]\s*", r"\n项目：", s)
-    s = re.sub(r"(?<!\n)\s*(Project)\s*[:：]\s*", r"\nProject:", s, flags=re.IGNORECASE)
+    s = _INLINE_PROJECT_CN_RE.sub(r"\n项目：", s)
+    s = _INLINE_PROJECT_EN_RE.sub(r"\nProject:", s)
 
     # If multiple experience entries are glued on a single line:
     # "... 2022.11-至今北京中体联合数据科技有限公司 ..." -> break after the period.
-    try:
-        s = re.sub(
-            rf"({_PROJECT_PERIOD_RANGE_RE.pattern})(?=(?:\s*)[\u4e00-\u9fff]{{2,}}(?:有限责任公司|有限公司|公司|集团|科技|信息|数据))",
-            r"\1\n",
-            s,
-            flags=re.IGNORECASE,
-        )
-    except Exception:
-        pass
+    s = _GLUED_PERIOD_COMPANY_RE.sub(r"\1\n", s)
 
     # Normalize excessive blank lines.
-    s = re.sub(r"\n{3,}", "\n\n", s).strip()
+    s = _NEWLINE_RUN_RE.sub("\n\n", s).strip()
     return s
 
 
 _PROJECT_YM_RE_PART = (
     # IMPORTANT: month alternation must prefer 10/11/12; otherwise "11" may match as "1".
-    r"(?:(?:19|20)\d{2}\s*年\s*(?:1[0-2]|0?[1-9])\s*月?"
-    r"|(?:19|20)\d{2}\s*[.\-/]\s*(?:1[0-2]|0?[1-9]))"
+    # The year is factored out of the "年" / "./-" branches so it is matched once, not retried.
+    r"(?:(?:19|20)\d{2}\s*(?:年\s*(?:1[0-2]|0?[1-9])\s*月?|[.\-/]\s*(?:1[0-2]|0?[1-9])))"
 )
 
 _PROJECT_PERIOD_RANGE_RE = re.compile(
     r"(?P<period>"
     + _PROJECT_YM_RE_PART
-    + r"\s*(?:-|—|–|~|～|至|到)\s*"
+    + r"\s*[-—–~～至到]\s*"
     + r"(?:至今|现在|今|present|Present|current|Current|"
     + _PROJECT_YM_RE_PART
     + r")"
     + r")"
 )
 
+
+def _search_project_period(text: str) -> re.Match[str] | None:
+    # Every period starts with a "19xx"/"20xx" year; most item titles have none, so a
+    # substring test skips the regex engine for them.
+    if "19" not in text and "20" not in text:
+        return None
+    return _PROJECT_PERIOD_RANGE_RE.search(text)
+
+
+# Patterns used while splitting the projects section; compiled once here rather than
+# looked up (and, for the label/glue ones, rebuilt) on every call.
+_PROJECT_SECTION_LABELS = ("项目经历", "项目经验", "工作经历", "工作经验")
+_BAD_PROJECT_TITLES = frozenset(_PROJECT_SECTION_LABELS + ("工作", "项目", "经历", "内容", "职责", "成果"))
+_SECTION_LABEL_PREFIX_RE = re.compile(
+    r"^\s*(项目经历|项目经验|工作经历|工作经验|WORK EXPERIENCE|Work Experience)\s*[:：\-—]*\s*",
+    flags=re.IGNORECASE,
+)
+# Field labels that get their own line when glued inline. The boundary lookbehind keeps longer
+# labels intact (e.g. "项目成果：" must not become "项目\n成果："), so one alternation pass
+# is equivalent to substituting the labels one by one.
+_DISPLAY_FIELD_LABELS = (
+    "内容：",
+    "工作：",
+    "负责：",
+    "职责：",
+    "项目名称：",
+    "项目时间：",
+    "时间：",
+    "技术栈：",
+    "关键词：",
+    "项目成果：",
+    "项目结果：",
+    "成果：",
+    "结果：",
+    "项目描述：",
+    "描述：",
+)
+_DISPLAY_FIELD_LABEL_RE = re.compile(
+    r"(?<!\n)(?<![\u4e00-\u9fffA-Za-z0-9])(?:" + "|".join(map(re.escape, _DISPLAY_FIELD_LABELS)) + ")"
+)
+_INLINE_PROJECT_CN_RE = re.compile(r"(?<!\n)\s*(项目)\s*[:：]\s*")
+_INLINE_PROJECT_EN_RE = re.compile(r"(?<!\n)\s*(Project)\s*[:：]\s*", flags=re.IGNORECASE)
+_GLUED_PERIOD_COMPANY_RE = re.compile(
+    rf"({_PROJECT_PERIOD_RANGE_RE.pattern})(?=(?:\s*)[\u4e00-\u9fff]{{2,}}(?:有限责任公司|有限公司|公司|集团|科技|信息|数据))",
+    flags=re.IGNORECASE,
+)
+_NEWLINE_RUN_RE = re.compile(r"\n{3,}")
+_ITEM_INLINE_FIELD_RE = re.compile(r"(?:负责|职责|工作内容|内容|描述|技术栈|成果)\s*[:：]")
+_TITLE_BULLET_PREFIX_RE = re.compile(r"^\s*[-•·\u2022]+\s*")
+_TITLE_LABEL_TAIL_RE = re.compile(
+    r"(?:内容|工作|职责|项目成果|项目结果|成果|结果|项目描述|描述|技术栈|关键词)\s*[:：]\s*",
+    flags=re.IGNORECASE,
+)
+_TITLE_PART_SPLIT_RE = re.compile(r"[\n\r|丨】\]\)）;；。:：]")
+
+
 _YEAR_RE = r"(?:19|20)\d{2}"
 _EDU_PERIOD_RE = re.compile(
-    rf"(?:{_YEAR_RE}(?:[.\-/]\d{{1,2}})?\s*(?:-|—|–|~|～|至|到)\s*{_YEAR_RE}(?:[.\-/]\d{{1,2}})?)"
+    rf"(?:{_YEAR_RE}(?:[.\-/]\d{{1,2}})?\s*[-—–~～至到]\s*{_YEAR_RE}(?:[.\-/]\d{{1,2}})?)"
 )
 _EDU_LINE_RE = re.compile(rf"(?:大学|学院|学校|中学|高中|职高|技校).{{0,40}}{_EDU_PERIOD_RE.pattern}")
+_EDU_DEGREE_RE = re.compile(r"(?:本科|硕士|博士|学士|研究生|大专|中专|MBA|EMBA)", flags=re.IGNORECASE)
 
 
-def _looks_like_noise_token_line(line: str) -> bool:
-    s = str(line or "").strip()
-    if not s:
+def _is_education_stripped(s: str) -> bool:
+    if not s or len(s) > 80:
         return False
-    # Drop repeated long hex/base64-ish garbage lines (common in OCR/PDF extraction artifacts).
-    if len(s) < 24:
-        return False
-    if " " in s or "\t" in s:
+    # Both patterns need a "19xx"/"20xx" year; most lines have none, so skip the regex engine.
+    if "19" not in s and "20" not in s:
         return False
-    if re.fullmatch(r"[0-9a-fA-F]{24,}", s):
+    # _EDU_LINE_RE already embeds the year range; degree keywords still need one.
+    if _EDU_LINE_RE.search(s):
         return True
-    if re.fullmatch(r"[A-Za-z0-9_-]{28,}", s):
-        return True
-    return False
+    return _EDU_DEGREE_RE.search(s) is not None and _EDU_PERIOD_RE.search(s) is not None
 
 
 def _looks_like_education_line(line: str) -> bool:
-    s = str(line or "").strip()
-    if not s:
-        return False
-    if len(s) > 80:
-        return False
-    if _EDU_LINE_RE.search(s) and _EDU_PERIOD_RE.search(s):
-        return True
-    # Degree keywords + year range.
-    if re.search(r"(?:本科|硕士|博士|学士|研究生|大专|中专|MBA|EMBA)", s, flags=re.IGNORECASE) and _EDU_PERIOD_RE.search(s):
-        return True
-    return False
+    return _is_education_stripped(str(line or "").strip())
+
+
+def _is_body_drop_line(line: str) -> bool:
+    s = line.strip()
+    return _is_noise_token_stripped(s) or _is_education_stripped(s)
 
 
 _PROJECT_ITEM_RE = re.compile(
     r"^\s*(?:项目|Project|PROJECTS?)\s*[:：]\s*(?P<title>.+?)\s*$",
     flags=re.IGNORECASE,
 )
+_PROJECT_ITEM_PREFIXES = ("项目", "project")
 
 
-def _split_body_by_project_items(body: str) -> tuple[str, list[dict[str, str]]]:
+def _split_body_by_project_items(lines: list[str]) -> tuple[str, list[dict[str, str]]]:
     """
-    Split a long experience body into:
-    - preface text (before the first "项目：/Project:" item)
+    Split a long experience body (given as its already right-stripped lines) into:
+    - preface text (before the first "项目：/Project:" item; the whole body when there are no items)
     - project items blocks extracted from lines starting with "项目：/Project:"
     """
-    s = str(body or "").strip()
-    if not s:
-        return "", []
-
-    lines = [ln.rstrip() for ln in s.splitlines()]
     hits: list[tuple[int, re.Match[str]]] = []
     for i, ln in enumerate(lines):
+        # Cheap prefix test first: almost no body line starts with "项目"/"Project".
+        if not ln.lstrip()[:7].lower().startswith(_PROJECT_ITEM_PREFIXES):
+            continue
         m = _PROJECT_ITEM_RE.match(ln)
         if not m:
             continue
         title = str(m.group("title") or "").strip()
-        if not title or _looks_like_education_line(title) or _looks_like_noise_token_line(title):
+        if not title or _looks_like_education_line(title) or _is_noise_token_line(title):
             continue
         hits.append((i, m))
 
     if len(hits) < 2:
-        return s, []
+        return "\n".join(lines).strip(), []
 
     first_i = hits[0][0]
     preface = "\n".join(lines[:first_i]).strip()
@@ -1092,7 +1163,7 @@ def _split_body_by_project_items(body: str) -> tuple[str, list[dict[str, str]]]:
         # Example: "项目：XX系统 负责：.../职责：..."
         title = title_raw
         inline_body = ""
-        split_m = re.search(r"(?:负责|职责|工作内容|内容|描述|技术栈|成果)\s*[:：]", title_raw)
+        split_m = _ITEM_INLINE_FIELD_RE.search(title_raw)
         if split_m and split_m.start() > 2:
             title = title_raw[: split_m.start()].strip()
             inline_body = title_raw[split_m.start() :].strip()
@@ -1107,38 +1178,44 @@ def _split_body_by_project_items(body: str) -> tuple[str, list[dict[str, str]]]:
     return preface, blocks
 
 
+@dataclass(frozen=True, slots=True)
+class _ProjectHeader:
+    block_start: int
+    body_start: int
+    period: str
+    title: str
+
+
 def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
     """
     Split a raw "项目经历" section into blocks and render in a "title | period" layout.
     This parser is heuristic-based and aims to handle PDF-extraction glue across lines.
     Returns: [{"title":..., "period":..., "body":...}, ...]
     """
-    s = clean_projects_raw_for_display(text or "")
+    # The same stored section is re-split on every candidate view; the cached result is
+    # immutable, so each caller gets fresh dicts it may mutate.
+    return [dict(block) for block in _split_projects_raw_cached(text or "")]
+
+
+@lru_cache(maxsize=256)
+def _split_projects_raw_cached(text: str) -> tuple[tuple[tuple[str, str], ...], ...]:
+    s = clean_projects_raw_for_display(text)
     if not s:
-        return []
+        return ()
 
     def _norm_title(raw_title: str) -> str:
         title = str(raw_title or "").strip()
         if not title:
             return ""
-        title = re.sub(
-            r"^\s*(项目经历|项目经验|工作经历|工作经验|WORK EXPERIENCE|Work Experience)\s*[:：\-—]*\s*",
-            "",
-            title,
-            flags=re.IGNORECASE,
-        ).strip()
-        title = re.sub(r"^\s*[-•·\u2022]+\s*", "", title).strip()
-        title = re.sub(r"\s+", " ", title).strip()
+        title = _SECTION_LABEL_PREFIX_RE.sub("", title).strip()
+        title = _TITLE_BULLET_PREFIX_RE.sub("", title).strip()
+        title = _WHITESPACE_RUN_RE.sub(" ", title).strip()
         if not title:
             return ""
 
         # If a field label leaks into the "title" (common in PDF glue), keep the tail.
-        label_tail_re = re.compile(
-            r"(?:内容|工作|职责|项目成果|项目结果|成果|结果|项目描述|描述|技术栈|关键词)\s*[:：]\s*",
-            flags=re.IGNORECASE,
-        )
         last_tail = None
-        for m in label_tail_re.finditer(title):
+        for m in _TITLE_LABEL_TAIL_RE.finditer(title):
             last_tail = m
         if last_tail:
             cand = title[last_tail.end() :].strip()
@@ -1161,7 +1238,7 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
             title = title[2:].lstrip() or title
 
         if len(title) > 90:
-            parts = re.split(r"[\n\r|丨】\]\)）;；。:：]", title)
+            parts = _TITLE_PART_SPLIT_RE.split(title)
             parts = [p.strip() for p in parts if 2 <= len((p or "").strip()) <= 90]
             if parts:
                 title = parts[-1]
@@ -1169,24 +1246,18 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
                 title = title[-90:].strip()
 
         # Skip obviously-bad titles.
-        if title in {"项目经历", "项目经验", "工作经历", "工作经验", "工作", "项目", "经历", "内容", "职责", "成果"}:
+        if title in _BAD_PROJECT_TITLES:
             return ""
         return title
 
-    # Build line index for better header/body splitting.
-    line_starts: list[int] = [0]
-    for m in re.finditer(r"\n", s):
-        line_starts.append(m.end())
+    # Build line index for better header/body splitting: one C-level split plus running
+    # sums of line lengths, instead of a Python-level find() per newline.
+    line_starts: list[int] = list(accumulate([len(ln) + 1 for ln in s.split("\n")], initial=0))
+    line_starts.pop()  # the running sum past the last line is not a line start
 
     def _line_bounds(pos: int) -> tuple[int, int]:
         # Return [start, end) for the line containing pos.
-        idx = 0
-        for i, st in enumerate(line_starts):
-            if st > pos:
-                idx = max(0, i - 1)
-                break
-            idx = i
-        start = line_starts[idx]
+        start = line_starts[max(0, bisect_right(line_starts, pos) - 1)]
         end = s.find("\n", start)
         if end == -1:
             end = len(s)
@@ -1194,9 +1265,9 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
 
     periods = list(_PROJECT_PERIOD_RANGE_RE.finditer(s))
     if not periods:
-        return []
+        return ()
 
-    headers: list[dict[str, int | str]] = []
+    headers: list[_ProjectHeader] = []
     for m in periods:
         period_start = m.start()
         period_end = m.end()
@@ -1207,14 +1278,11 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
         title_source = s[line_start:period_start].strip()
 
         # If the period is on its own line (or title part is too short), pull title from previous non-empty line.
+        # Walk back from this line only, instead of rescanning every line start per period.
         if not title_source or len(title_source) <= 2:
-            for st in reversed(line_starts):
-                if st >= line_start:
-                    continue
-                prev_end = s.find("\n", st)
-                if prev_end == -1:
-                    prev_end = len(s)
-                prev_line = s[st:prev_end].strip()
+            for pi in range(bisect_right(line_starts, line_start) - 2, -1, -1):
+                st = line_starts[pi]
+                prev_line = s[st : line_starts[pi + 1] - 1].strip()
                 if prev_line:
                     header_start = st
                     title_source = prev_line
@@ -1242,26 +1310,17 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
             _ps, pe_line_end = _line_bounds(period_end)
             body_start = pe_line_end
 
-        headers.append(
-            {
-                "block_start": int(block_start),
-                "body_start": int(body_start),
-                "period_start": int(period_start),
-                "period_end": int(period_end),
-                "period": str(m.group("period") or "").strip(),
-                "title": title,
-            }
-        )
+        headers.append(_ProjectHeader(block_start, body_start, m.group("period").strip(), title))
 
     if not headers:
-        return []
+        return ()
 
     # De-dupe/ensure monotonic order.
-    headers.sort(key=lambda x: int(x["block_start"]))
-    uniq: list[dict[str, int | str]] = []
+    headers.sort(key=lambda x: x.block_start)
+    uniq: list[_ProjectHeader] = []
     last_pos = -1
     for h in headers:
-        pos = int(h["block_start"])
+        pos = h.block_start
         if pos <= last_pos:
             continue
         last_pos = pos
@@ -1270,46 +1329,35 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
 
     out: list[dict[str, str]] = []
     for i, h in enumerate(headers):
-        block_start = int(h["block_start"])
-        period_end = int(h["period_end"])
-        body_start = int(h.get("body_start") or period_end)
-        next_start = int(headers[i + 1]["block_start"]) if i + 1 < len(headers) else len(s)
-
-        body = s[body_start:next_start].strip()
-        body = body.lstrip("：: \t-—–~～")
-        body = re.sub(r"\n{3,}", "\n\n", body).strip()
-
-        # Remove obvious education/noise lines inside body.
-        body_lines = [ln.rstrip() for ln in body.splitlines()]
-        cleaned_lines: list[str] = []
-        for ln in body_lines:
-            if _looks_like_noise_token_line(ln):
-                continue
-            if _looks_like_education_line(ln):
-                continue
-            cleaned_lines.append(ln)
-        body = "\n".join(cleaned_lines).strip()
+        # Only the first 20 blocks are kept; stop instead of parsing bodies that get cut.
+        if len(out) >= 20:
+            break
+        title = h.title
+        period = h.period
+        next_start = headers[i + 1].block_start if i + 1 < len(headers) else len(s)
+
+        body = s[h.body_start : next_start].strip()
+        # `s` has no "\n\n\n" runs left (clean_projects_raw_for_display collapsed them), so neither does body.
+        body = body.lstrip("：: \t-—–~～").strip()
+
+        # Remove obvious education/noise lines inside body; the item splitter works on these
+        # lines directly instead of re-splitting a joined copy.
+        body_lines = [ln.rstrip() for ln in body.splitlines() if not _is_body_drop_line(ln)]
 
         # Further split by explicit "项目：" items inside a work-experience block.
-        preface, items = _split_body_by_project_items(body)
+        preface, items = _split_body_by_project_items(body_lines)
         if items:
             if preface:
-                out.append(
-                    {"title": str(h["title"]), "period": str(h["period"]), "body": preface, "kind": "work"}
-                )
+                out.append({"title": title, "period": period, "body": preface, "kind": "work"})
             for it in items:
                 # For child "项目：" items, do NOT blindly inherit the work period.
                 # If the item has no explicit time window, leave it empty. This prevents
                 # showing the same company period for every project (common resume format).
-                item_body = str(it.get("body") or "")
-                item_title = str(it.get("title") or "")
-                item_period = ""
-                try:
-                    m = _PROJECT_PERIOD_RANGE_RE.search(item_title) or _PROJECT_PERIOD_RANGE_RE.search(item_body)
-                    if m:
-                        item_period = str(m.group("period") or "").strip()
-                except Exception:
-                    item_period = ""
+                # _split_body_by_project_items always fills title/body with stripped strings.
+                item_body = it["body"]
+                item_title = it["title"]
+                m = _search_project_period(item_title) or _search_project_period(item_body)
+                item_period = m.group("period").strip() if m else ""
                 out.append(
                     {
                         "title": item_title,
@@ -1319,9 +1367,96 @@ def split_projects_raw_into_blocks(text: str) -> list[dict[str, str]]:
                     }
                 )
         else:
-            out.append({"title": str(h["title"]), "period": str(h["period"]), "body": body, "kind": "project"})
+            out.append({"title": title, "period": period, "body": preface, "kind": "project"})
+
+    return tuple(tuple(block.items()) for block in out[:20])
+
+
+_FOCUS_SECTION_KEYWORDS = (
+    # Chinese headings (common)
+    "基本信息",
+    "个人信息",
+    "联系方式",
+    "教育",
+    "教育背景",
+    "教育经历",
+    "学习经历",
+    "项目",
+    "项目经历",
+    "项目经验",
+    "科研项目",
+    "课程设计",
+    "毕业设计",
+    "比赛项目",
+    "ʵϰ",
+    "实习经历",
+    "工作经历",
+    "经历",
+    "技能",
+    "专业技能",
+    "技术栈",
+    "证书",
+    "资格",
+    "英语",
+    "CET",
+    "四六级",
+    "获奖",
+    "获奖经历",
+    "获奖情况",
+    "荣誉",
+    "奖项",
+    "竞赛",
+    "论文",
+    "发表",
+    "出版",
+    "专利",
+    "成果",
+    # English headings (some resumes are bilingual)
+    "education",
+    "work experience",
+    "experience",
+    "internship",
+    "projects",
+    "project experience",
+    "skills",
+    "certificates",
+    "certifications",
+    "awards",
+    "honors",
+    "publications",
+    "papers",
+    "patents",
+    "contact",
+    "profile",
+    "summary",
+)
+# One alternation over the lowered keywords: a single C-level scan per line instead of
+# one `in` probe per keyword. Keywords containing a shorter keyword are redundant.
+# The compiled pattern already carries a first-character charset, so lines without any
+# keyword-initial character are rejected inside the regex engine; an extra Python-level
+# prefilter (translate/isdisjoint) measured 2-6x slower than the bare search.
+_FOCUS_KEYWORDS_LOWER = tuple(k.lower() for k in _FOCUS_SECTION_KEYWORDS)
+_FOCUS_KEYWORD_RE = re.compile(
+    "|".join(
+        re.escape(k)
+        for k in _FOCUS_KEYWORDS_LOWER
+        if not any(other != k and other in k for other in _FOCUS_KEYWORDS_LOWER)
+    )
+)
 
-    return out[:20]
+
+def _focus_keyword_hit_lines(s: str, line_starts: list[int]) -> list[int]:
+    """Return ascending indices of lines in `s` containing a focus keyword (case-insensitive)."""
+    low = s.lower()
+    if len(low) != len(s):
+        # str.lower() expands a few code points (e.g. "İ"), so offsets would drift.
+        return [i for i, line in enumerate(s.split("\n")) if _FOCUS_KEYWORD_RE.search(line.lower())]
+    hits: list[int] = []
+    for m in _FOCUS_KEYWORD_RE.finditer(low):
+        i = bisect_right(line_starts, m.start()) - 1
+        if not hits or hits[-1] != i:
+            hits.append(i)
+    return hits
 
 
 def focus_resume_text_for_details(
@@ -1333,110 +1468,61 @@ def focus_resume_text_for_details(
     window_before_lines: int = 18,
     window_after_lines: int = 32,
     max_windows: int = 6,
+    clean: bool = True,
 ) -> str:
     """
     Build a compact, information-dense subset of the resume text for LLM extraction.
+    Pass `clean=False` when `raw` already went through `_clean_text_for_llm`.
 
     Goals:
     - Keep latency/cost stable by limiting prompt length.
     - Still capture key sections even when PDF extraction glues content.
     - Prefer including both header (identity/contact) and tail (awards/publications).
+    - Return the cleaned text unchanged when it already fits in `max_chars`.
     """
-    s = _clean_text_for_llm(raw)
+    s = _clean_text_for_llm(raw) if clean else raw
     if not s:
         return ""
+    if max_chars and len(s) <= int(max_chars):
+        return s
 
     head = s[: max(0, int(head_chars or 0))] if head_chars else ""
     tail = s[-max(0, int(tail_chars or 0)) :] if tail_chars and len(s) > tail_chars else ""
 
-    keywords = [
-        # Chinese headings (common)
-        "基本信息",
-        "个人信息",
-        "联系方式",
-        "教育",
-        "教育背景",
-        "教育经历",
-        "学习经历",
-        "项目",
-        "项目经历",
-        "项目经验",
-        "科研项目",
-        "课程设计",
-        "毕业设计",
-        "比赛项目",
-        "ʵϰ",
-        "实习经历",
-        "工作经历",
-        "经历",
-        "技能",
-        "专业技能",
-        "技术栈",
-        "证书",
-        "资格",
-        "英语",
-        "CET",
-        "四六级",
-        "获奖",
-        "获奖经历",
-        "获奖情况",
-        "荣誉",
-        "奖项",
-        "竞赛",
-        "论文",
-        "发表",
-        "出版",
-        "专利",
-        "成果",
-        # English headings (some resumes are bilingual)
-        "education",
-        "work experience",
-        "experience",
-        "internship",
-        "projects",
-        "project experience",
-        "skills",
-        "certificates",
-        "certifications",
-        "awards",
-        "honors",
-        "publications",
-        "papers",
-        "patents",
-        "contact",
-        "profile",
-        "summary",
-    ]
-
-    lines = s.splitlines()
-    hits: list[int] = []
-    for i, line in enumerate(lines):
-        lo = (line or "").strip()
-        if not lo:
-            continue
-        llo = lo.lower()
-        for kw in keywords:
-            k = (kw or "").strip()
-            if not k:
-                continue
-            if k.lower() in llo:
-                hits.append(i)
-                break
-
+    # `s` is "\n"-joined by _clean_text_for_llm, so line spans index straight into it and
+    # windows are emitted as single slices instead of re-joining per-line strings.
+    line_starts = [0]
+    nl = s.find("\n")
+    while nl != -1:
+        line_starts.append(nl + 1)
+        nl = s.find("\n", nl + 1)
+    line_count = len(line_starts)
+    line_starts.append(len(s) + 1)
+    hits = _focus_keyword_hit_lines(s, line_starts)
+
+    # Sort-merge sweep over the (ascending) hits: overlapping spans extend the current
+    # window, and we stop only when a new window would exceed `max_windows`.
+    before = int(window_before_lines)
+    after = int(window_after_lines)
+    window_limit = max(1, int(max_windows))
     windows: list[tuple[int, int]] = []
-    for idx in hits[:80]:
-        a = max(0, idx - int(window_before_lines))
-        b = min(len(lines), idx + int(window_after_lines))
+    for idx in hits:
+        a = max(0, idx - before)
+        b = min(line_count, idx + after)
         if windows and a <= windows[-1][1]:
-            windows[-1] = (windows[-1][0], max(windows[-1][1], b))
+            if b > windows[-1][1]:
+                windows[-1] = (windows[-1][0], b)
+        elif len(windows) >= window_limit:
+            break
         else:
             windows.append((a, b))
-        if len(windows) >= int(max_windows):
-            break
 
     body_parts: list[str] = []
     for a, b in windows:
-        chunk = "\n".join(lines[a:b]).strip()
+        # An empty window (e.g. window_after_lines=0 on line 0) would slice s[0:-1].
+        if b <= a:
+            continue
+        chunk = s[line_starts[a] : line_starts[b] - 1].strip()
         if chunk:
             body_parts.append(chunk)
     body = "\n\n".join(body_parts).strip()
@@ -1460,10 +1546,25 @@ def _env_int(name: str, default: int) -> int:
         return int(default)
 
 
+@lru_cache(maxsize=1)
+def _details_limits() -> tuple[int, int, int, int]:
+    """
+    (text_max, focus_max, exp_max, prompt_max) for `_build_details_llm_prompt`.
+    Process-level knobs: read once; call `_details_limits.cache_clear()` after changing the env.
+    """
+    return (
+        _env_int("RESUME_DETAILS_TEXT_MAX_CHARS", 60000),
+        _env_int("RESUME_DETAILS_FOCUS_MAX_CHARS", 45000),
+        _env_int("RESUME_EXPERIENCE_RAW_MAX_CHARS", 50000),
+        _env_int("RESUME_DETAILS_PROMPT_MAX_CHARS", 100000),
+    )
+
+
 def _truncate(s: str, max_chars: int) -> str:
+    """Cut `s` to `max_chars` (rstripping the cut edge); returns `s` itself when nothing is cut."""
     if not s:
         return ""
-    if not max_chars or int(max_chars) <= 0:
+    if not max_chars or int(max_chars) <= 0 or len(s) <= int(max_chars):
         return s
     return s[: int(max_chars)].rstrip()
 
@@ -1477,7 +1578,7 @@ def _build_details_llm_prompt(text: str) -> str:
     configurable size, and we also include an explicit "experience raw" chunk to
     help the model split experience blocks without summarizing.
 
-    Env knobs (optional):
+    Env knobs (optional, read once per process via `_details_limits()`):
     - RESUME_DETAILS_TEXT_MAX_CHARS: prefer full text up to this size (default 60000)
     - RESUME_DETAILS_FOCUS_MAX_CHARS: focus to this size when full text is too long (default 45000)
     - RESUME_EXPERIENCE_RAW_MAX_CHARS: max chars for experience_raw in prompt (default 50000)
@@ -1490,16 +1591,13 @@ def _build_details_llm_prompt(text: str) -> str:
     if not s:
         return ""
 
-    text_max = _env_int("RESUME_DETAILS_TEXT_MAX_CHARS", 60000)
-    focus_max = _env_int("RESUME_DETAILS_FOCUS_MAX_CHARS", 45000)
-    exp_max = _env_int("RESUME_EXPERIENCE_RAW_MAX_CHARS", 50000)
-    prompt_max = _env_int("RESUME_DETAILS_PROMPT_MAX_CHARS", 100000)
+    text_max, focus_max, exp_max, prompt_max = _details_limits()
 
     if (not text_max) or (text_max > 0 and len(s) <= int(text_max)):
         main = s
     else:
         mm = 0 if (not focus_max) or int(focus_max) <= 0 else max(1000, int(focus_max))
-        main = focus_resume_text_for_details(s, max_chars=mm)
+        main = focus_resume_text_for_details(s, max_chars=mm, clean=False)
 
     experience_raw = ""
     try:
@@ -1518,18 +1616,16 @@ def _build_details_llm_prompt(text: str) -> str:
     if not experience_raw:
         return _truncate(prefix + main + suffix, prompt_max).strip() + "\n"
 
-    exp_section = exp_prefix + experience_raw + suffix
-    if prompt_max and len(prefix) + len(main) + len("\n") + len(exp_section) > int(prompt_max):
-        allow_main = int(prompt_max) - len(prefix) - len("\n") - len(exp_section)
+    # Budget with integer lengths only; the (up to ~100k char) prompt is joined exactly once.
+    overhead = len(prefix) + len("\n") + len(exp_prefix) + len(suffix)
+    if prompt_max and overhead + len(main) + len(experience_raw) > int(prompt_max):
+        allow_main = int(prompt_max) - overhead - len(experience_raw)
         if allow_main < 0:
-            allow_exp = int(prompt_max) - len(prefix) - len("\n") - len(exp_prefix) - len(suffix)
-            allow_exp = max(0, allow_exp)
-            experience_raw = _truncate(experience_raw, allow_exp)
-            exp_section = exp_prefix + experience_raw + suffix
+            experience_raw = _truncate(experience_raw, max(0, int(prompt_max) - overhead))
             allow_main = 0
         main = _truncate(main, max(0, allow_main))
 
-    return (prefix + main + "\n" + exp_section).strip() + "\n"
+    return "".join((prefix, main, "\n", exp_prefix, experience_raw, suffix)).strip() + "\n"
 
 
 def parse_resume_identity_fast(text: str) -> dict[str, Any]:
@@ -1541,15 +1637,18 @@ def parse_resume_identity_fast(text: str) -> dict[str, Any]:
     if not t:
         return {"name": "", "phone": "", "confidence": {"name": 0, "phone": 0}, "method": "fast"}
 
-    raw = t.translate(_FULLWIDTH_DIGITS)
+    # Identity lives in the header: only the head is normalized and scanned, and the
+    # whole text is searched for a phone only when the head has none.
+    raw = t[:_IDENTITY_HEAD_CHARS].translate(_FULLWIDTH_DIGITS)
     phone = _guess_phone_from_text(raw)
+    if not phone and len(t) > _IDENTITY_HEAD_CHARS:
+        phone = _guess_phone_from_text(t)
 
     name = ""
     # 1) Prefer explicit labels.
-    m = re.search(r"(?:^|[\n\r\t ])(?:姓名|Name)\s*[:：]?\s*([A-Za-z\u4e00-\u9fff·\\s]{2,20})", raw, flags=re.IGNORECASE)
+    m = _NAME_LABEL_RE.search(raw)
     if m:
         name = (m.group(1) or "").strip()
-        name = re.sub(r"\s+", " ", name)
     # 2) Fallback: first meaningful line (avoid common header words).
     if not name:
         for line in raw.splitlines()[:8]:
@@ -1559,11 +1658,11 @@ def parse_resume_identity_fast(text: str) -> dict[str, Any]:
             if any(k in s for k in ("个人简历", "简历", "求职", "简历投递", "Resume", "Curriculum Vitae")):
                 continue
             # likely a name-only line
-            if re.fullmatch(r"[\u4e00-\u9fff]{2,4}", s):
+            if _CN_NAME_LINE_RE.fullmatch(s):
                 name = s
                 break
-            if re.fullmatch(r"[A-Za-z][A-Za-z\\s·]{1,19}", s):
-                name = re.sub(r"\s+", " ", s)
+            if _EN_NAME_LINE_RE.fullmatch(s):
+                name = _WHITESPACE_RUN_RE.sub(" ", s)
                 break
 
     phone_conf = 85 if phone else 0
@@ -1573,6 +1672,21 @@ def parse_resume_identity_fast(text: str) -> dict[str, Any]:
     return {"name": name, "phone": phone, "confidence": {"name": name_conf, "phone": phone_conf}, "method": "fast"}
 
 
+_NAME_SYSTEM_PROMPT = """
+你是一个“简历信息抽取助手”。只从【简历文本】中抽取候选人姓名。
+
+要求：
+1) 只能输出 JSON（不要 Markdown、不要解释）。
+2) 不要编造：找不到就输出空字符串。
+3) 过滤明显的水印/噪声行（例如一整行只有 A-Za-z0-9_- 且很长的 token 串），不要把它当成姓名。
+
+输出格式：
+{"name": string, "confidence": number}
+
+confidence 是 0-100 的整数，表示你对 name 的可信度。
+""".strip()
+
+
 def parse_resume_name_llm(text: str) -> dict[str, Any]:
     """
     Use LLM to extract only the candidate name from resume text.
@@ -1586,19 +1700,7 @@ def parse_resume_name_llm(text: str) -> dict[str, Any]:
     if use_llm in {"0", "false", "no"}:
         return {"name": "", "confidence": 0}
 
-    system = """
-你是一个“简历信息抽取助手”。只从【简历文本】中抽取候选人姓名。
-
-要求：
-1) 只能输出 JSON（不要 Markdown、不要解释）。
-2) 不要编造：找不到就输出空字符串。
-3) 过滤明显的水印/噪声行（例如一整行只有 A-Za-z0-9_- 且很长的 token 串），不要把它当成姓名。
-
-输出格式：
-{"name": string, "confidence": number}
-
-confidence 是 0-100 的整数，表示你对 name 的可信度。
-""".strip()
+    system = _NAME_SYSTEM_PROMPT
     # Keep prompt small for latency.
     focused = _clean_text_for_llm(t)[:5200]
     prompt = "[简历文本]\n" + focused + "\n"
@@ -1606,13 +1708,7 @@ confidence 是 0-100 的整数，表示你对 name 的可信度。
     if not raw:
         return {"name": "", "confidence": 0}
     try:
-        s = raw
-        if not (s.startswith("{") and s.endswith("}")):
-            l = s.find("{")
-            r = s.rfind("}")
-            if l != -1 and r != -1 and r > l:
-                s = s[l : r + 1]
-        obj = json.loads(s)
+        obj = _loads_llm_json(raw)
     except Exception:
         logger.warning("Resume name LLM output parse failed: %r", raw[:400])
         return {"name": "", "confidence": 0}
@@ -1627,20 +1723,14 @@ confidence 是 0-100 的整数，表示你对 name 的可信度。
     return {"name": name, "confidence": name_conf}
 
 
-def parse_resume_details_llm(text: str) -> dict[str, Any]:
-    """
-    Use LLM to extract additional resume details (non-identity fields).
-    Returns a JSON-friendly dict (best-effort).
-    """
-    t = (text or "").strip()
-    if not t:
-        return {}
+def _normalize_details_block_kind(value: Any) -> str:
+    kind = _resume_string(value).lower()
+    if kind in {"work", "project"}:
+        return kind
+    return "work" if "work" in kind else ("project" if "proj" in kind else "")
 
-    use_llm = os.getenv("RESUME_USE_LLM", "").strip().lower()
-    if use_llm in {"0", "false", "no"}:
-        return {}
 
-    system = """
+_DETAILS_SYSTEM_PROMPT = """
 你是一个“简历结构化解析助手”。你的任务是：只根据给定的【简历文本】抽取信息，输出一个 JSON 对象。
 
 重要规则：
@@ -1705,8 +1795,22 @@ def parse_resume_details_llm(text: str) -> dict[str, Any]:
 - awards/certifications/publications：能从简历里直接抄到的条目再写，不要编造。
 - english：识别四级/六级分数（如：CET-4 510 / 四级：560）。
 """.strip()
-    focused = _clean_text_for_llm(focus_resume_text_for_details(t))
-    prompt = "[简历文本]\n" + focused + "\n"
+
+
+def parse_resume_details_llm(text: str) -> dict[str, Any]:
+    """
+    Use LLM to extract additional resume details (non-identity fields).
+    Returns a JSON-friendly dict (best-effort).
+    """
+    t = (text or "").strip()
+    if not t:
+        return {}
+
+    use_llm = os.getenv("RESUME_USE_LLM", "").strip().lower()
+    if use_llm in {"0", "false", "no"}:
+        return {}
+
+    system = _DETAILS_SYSTEM_PROMPT
     prompt = _build_details_llm_prompt(t)
     if not prompt.strip():
         return {}
@@ -1720,113 +1824,34 @@ def parse_resume_details_llm(text: str) -> dict[str, Any]:
             + ". Check OPENAI_API_KEY/OPENAI_BASE_URL/OPENAI_MODEL and confirm the API key has permission for this endpoint."
         )
     try:
-        s = raw
-        if not (s.startswith("{") and s.endswith("}")):
-            l = s.find("{")
-            r = s.rfind("}")
-            if l != -1 and r != -1 and r > l:
-                s = s[l : r + 1]
-        obj = json.loads(s)
+        obj = _loads_llm_json(raw)
     except Exception:
         logger.warning("Resume details LLM output parse failed: %r", raw[:400])
         return {}
 
-    def _s(v) -> str:
-        return str(v or "").strip()
-
-    def _uniq_str_list(v) -> list[str]:
-        if not isinstance(v, list):
-            if isinstance(v, str):
-                # split by common bullet separators/newlines
-                parts = re.split(r"[\\n\\r•·\\-–—\\u2022]+", v)
-                parts = [p.strip() for p in parts if p.strip()]
-                return parts[:30]
-            return []
-        items = [str(x or "").strip() for x in v]
-        items = [x for x in items if x]
-        # preserve some order but de-dupe
-        out: list[str] = []
-        seen: set[str] = set()
-        for x in items:
-            if x in seen:
-                continue
-            seen.add(x)
-            out.append(x)
-        return out
-
-    def _num_or_none(v):
-        if v is None or v == "":
-            return None
-        try:
-            return float(v)
-        except Exception:
-            return None
-
-    def _norm_degree(v: str) -> str:
-        s = _s(v)
-        if not s:
-            return "δ֪"
-        s = s.replace("学士", "本科").replace("研究生", "硕士")
-        if s in {"本科", "硕士", "博士", "大专", "高中", "未知"}:
-            return s
-        if "博" in s:
-            return "博士"
-        if "˶" in s:
-            return "˶ʿ"
-        if "本" in s:
-            return "本科"
-        if "ר" in s:
-            return "大专"
-        if "高" in s:
-            return "高中"
-        return "δ֪"
-
-    def _norm_gender(v: str) -> str:
-        s = _s(v)
-        if s in {"男", "女", "未知"}:
-            return s
-        if s in {"M", "Male", "male"}:
-            return "男"
-        if s in {"F", "Female", "female"}:
-            return "Ů"
-        return "δ֪" if s else ""
-
     # Normalize basic types.
     out: dict[str, Any] = {}
-    def _norm_summary(v: str) -> str:
-        s = _s(v)
-        if not s:
-            return ""
-        s = re.sub(r"\\s+", " ", s).strip()
-        if len(s) > 120:
-            s = s[:120].rstrip(" ,，;；.。")
-            if s:
-                s += "…"
-        return s
-
-    out["summary"] = _norm_summary(obj.get("summary"))
-    out["gender"] = _norm_gender(obj.get("gender"))
-    out["emails"] = _uniq_str_list(obj.get("emails") or [])
-    out["skills"] = _uniq_str_list(obj.get("skills") or [])
-    out["highest_education"] = _norm_degree(obj.get("highest_education"))
+    out["summary"] = _normalize_resume_summary(obj.get("summary"))
+    out["gender"] = _normalize_resume_gender(obj.get("gender"))
+    out["emails"] = _resume_unique_str_list(obj.get("emails"))
+    out["skills"] = _resume_unique_str_list(obj.get("skills"))
+    out["highest_education"] = _normalize_resume_degree(obj.get("highest_education"), strict=True)
 
     educations = obj.get("educations") or []
-    norm_edu: list[dict[str, Any]] = []
-    if isinstance(educations, list):
-        for e in educations[:10]:
-            if not isinstance(e, dict):
-                continue
-            degree = _norm_degree(e.get("degree"))
-            school = _s(e.get("school"))
-            major = _s(e.get("major"))
-            start = _s(e.get("start"))
-            end = _s(e.get("end"))
-            if not any([school, major, start, end]) and degree == "δ֪":
-                continue
-            norm_edu.append(
-                {"degree": degree, "school": school, "major": major, "start": start, "end": end}
-            )
-    out["educations"] = norm_edu
+    edu_rows = (
+        {
+            "degree": _normalize_resume_degree(e.get("degree"), strict=True),
+            "school": _resume_string(e.get("school")),
+            "major": _resume_string(e.get("major")),
+            "start": _resume_string(e.get("start")),
+            "end": _resume_string(e.get("end")),
+        }
+        for e in (educations[:10] if isinstance(educations, list) else [])
+        if isinstance(e, dict)
+    )
+    out["educations"] = [
+        r for r in edu_rows if r["degree"] != "未知" or r["school"] or r["major"] or r["start"] or r["end"]
+    ]
 
     english = obj.get("english") or {}
     en_out: dict[str, Any] = {}
@@ -1834,72 +1859,72 @@ def parse_resume_details_llm(text: str) -> dict[str, Any]:
         cet4 = english.get("cet4")
         cet6 = english.get("cet6")
         if isinstance(cet4, dict) or cet4 is None:
-            en_out["cet4"] = None if cet4 is None else {"score": _num_or_none((cet4 or {}).get("score"))}
+            en_out["cet4"] = None if cet4 is None else {"score": _resume_num_or_none((cet4 or {}).get("score"))}
         if isinstance(cet6, dict) or cet6 is None:
-            en_out["cet6"] = None if cet6 is None else {"score": _num_or_none((cet6 or {}).get("score"))}
+            en_out["cet6"] = None if cet6 is None else {"score": _resume_num_or_none((cet6 or {}).get("score"))}
     out["english"] = en_out
 
     projects = obj.get("projects") or []
-    norm_proj: list[dict[str, Any]] = []
-    if isinstance(projects, list):
-        for p in projects[:6]:
-            if not isinstance(p, dict):
-                continue
-            desc = p.get("description")
-            norm_proj.append(
-                {
-                    "name": _s(p.get("name")),
-                    "role": _s(p.get("role")),
-                    "period": _s(p.get("period")),
-                    "description": _uniq_str_list(desc or [])[:8],
-                }
-            )
-    out["projects"] = norm_proj
+    out["projects"] = [
+        {
+            "name": _resume_string(p.get("name")),
+            "role": _resume_string(p.get("role")),
+            "period": _resume_string(p.get("period")),
+            "description": _resume_unique_str_list(p.get("description"), limit=8),
+        }
+        for p in (projects[:6] if isinstance(projects, list) else [])
+        if isinstance(p, dict)
+    ]
 
     exp_blocks = obj.get("experience_blocks") or []
-    norm_blocks: list[dict[str, Any]] = []
-    if isinstance(exp_blocks, list):
-        for b in exp_blocks[:20]:
-            if not isinstance(b, dict):
-                continue
-            kind = _s(b.get("kind")).lower()
-            if kind not in {"work", "project"}:
-                kind = "work" if "work" in kind else ("project" if "proj" in kind else "")
-            title = _s(b.get("title"))
-            period = _s(b.get("period"))
-            body = _s(b.get("body"))
-            if not title and not body:
-                continue
+    block_rows = (
+        {
+            "kind": _normalize_details_block_kind(b.get("kind")),
+            "title": _resume_string(b.get("title")),
+            "period": _resume_string(b.get("period")),
             # keep body multiline but avoid excessive blanks
-            body = re.sub(r"\n{4,}", "\n\n\n", body).strip()
-            norm_blocks.append({"kind": kind, "title": title, "period": period, "body": body})
-    out["experience_blocks"] = norm_blocks
+            "body": _BLANK_LINE_RUN_RE.sub("\n\n\n", _resume_string(b.get("body"))).strip(),
+        }
+        for b in (exp_blocks[:20] if isinstance(exp_blocks, list) else [])
+        if isinstance(b, dict)
+    )
+    out["experience_blocks"] = [r for r in block_rows if r["title"] or r["body"]]
 
     work_exps = obj.get("work_experiences") or []
-    norm_work: list[dict[str, Any]] = []
-    if isinstance(work_exps, list):
-        for w in work_exps[:6]:
-            if not isinstance(w, dict):
-                continue
-            desc = w.get("description")
-            norm_work.append(
-                {
-                    "company": _s(w.get("company")),
-                    "title": _s(w.get("title")),
-                    "period": _s(w.get("period")),
-                    "description": _uniq_str_list(desc or [])[:8],
-                }
-            )
-    out["work_experiences"] = norm_work
-
-    out["awards"] = _uniq_str_list(obj.get("awards") or [])[:20]
-    out["certifications"] = _uniq_str_list(obj.get("certifications") or [])[:20]
-    out["publications"] = _uniq_str_list(obj.get("publications") or [])[:20]
-
-    out["experience_years"] = _num_or_none(obj.get("experience_years"))
+    out["work_experiences"] = [
+        {
+            "company": _resume_string(w.get("company")),
+            "title": _resume_string(w.get("title")),
+            "period": _resume_string(w.get("period")),
+            "description": _resume_unique_str_list(w.get("description"), limit=8),
+        }
+        for w in (work_exps[:6] if isinstance(work_exps, list) else [])
+        if isinstance(w, dict)
+    ]
+
+    out["awards"] = _resume_unique_str_list(obj.get("awards"), limit=20)
+    out["certifications"] = _resume_unique_str_list(obj.get("certifications"), limit=20)
+    out["publications"] = _resume_unique_str_list(obj.get("publications"), limit=20)
+
+    out["experience_years"] = _resume_num_or_none(obj.get("experience_years"))
     return out
 
 
+_IDENTITY_SYSTEM_PROMPT = """
+你是一个“简历信息抽取助手”。只从【简历文本】中抽取候选人的姓名与手机号。
+
+要求：
+1) 只能输出 JSON（不要 Markdown、不要解释）。
+2) phone 必须是 11 位中国大陆手机号（只输出数字）；无法确定就输出空字符串。
+3) 过滤明显的水印/噪声行（例如一整行只有 A-Za-z0-9_- 且很长的 token 串），不要把它当成姓名或手机号来源。
+
+输出格式：
+{"name": string, "phone": string, "confidence": {"name": number, "phone": number}}
+
+confidence 为 0-100 的整数，表示可信度。
+""".strip()
+
+
 def parse_resume_identity_llm(text: str) -> dict[str, Any]:
     """
     Use LLM to extract candidate identity from resume text.
@@ -1914,23 +1939,11 @@ def parse_resume_identity_llm(text: str) -> dict[str, Any]:
         phone = _guess_phone_from_text(t)
         return {"name": "", "phone": phone, "confidence": {"name": 0, "phone": 40 if phone else 0}}
 
-    system = """
-你是一个“简历信息抽取助手”。只从【简历文本】中抽取候选人的姓名与手机号。
-
-要求：
-1) 只能输出 JSON（不要 Markdown、不要解释）。
-2) phone 必须是 11 位中国大陆手机号（只输出数字）；无法确定就输出空字符串。
-3) 过滤明显的水印/噪声行（例如一整行只有 A-Za-z0-9_- 且很长的 token 串），不要把它当成姓名或手机号来源。
-
-输出格式：
-{"name": string, "phone": string, "confidence": {"name": number, "phone": number}}
-
-confidence 为 0-100 的整数，表示可信度。
-""".strip()
+    system = _IDENTITY_SYSTEM_PROMPT
     # Keep prompt small for latency: first chunk + a window around the phone number if present.
     head = t[:2400]
     around = ""
-    m = re.search(r"(?:\\+?86[\\s-]*)?(1[3-9]\\d{9})", t.translate(_FULLWIDTH_DIGITS))
+    m = _PHONE_IN_TEXT_RE.search(t.translate(_FULLWIDTH_DIGITS))
     if m:
         s = max(0, m.start() - 500)
         e = min(len(t), m.end() + 500)
@@ -1944,13 +1957,7 @@ confidence 为 0-100 的整数，表示可信度。
         phone = _guess_phone_from_text(t)
         return {"name": "", "phone": phone, "confidence": {"name": 0, "phone": 40 if phone else 0}}
     try:
-        s = raw
-        if not (s.startswith("{") and s.endswith("}")):
-            l = s.find("{")
-            r = s.rfind("}")
-            if l != -1 and r != -1 and r > l:
-                s = s[l : r + 1]
-        obj = json.loads(s)
+        obj = _loads_llm_json(raw)
     except Exception:
         logger.warning("Resume identity LLM output parse failed: %r", raw[:400])
         phone = _guess_phone_from_text(t)
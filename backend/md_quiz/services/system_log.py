@@ -4,7 +4,7 @@ from typing import Any
 
 from backend.md_quiz.config import logger
 from backend.md_quiz.storage.db import create_system_log
-from backend.md_quiz.services.audit_context import get_audit_context
+from backend.md_quiz.services.audit_context import peek_audit_context
 
 
 def log_event(
@@ -22,24 +22,25 @@ def log_event(
     user_agent: str | None = None,
     meta: dict[str, Any] | None = None,
 ) -> int:
-    ctx = get_audit_context()
-    a = str(actor or ctx.get("actor") or "system")
-    cid = candidate_id if candidate_id is not None else ctx.get("candidate_id")
-    ek = quiz_key if quiz_key is not None else ctx.get("quiz_key")
-    t = token if token is not None else ctx.get("token")
-    ip2 = str(ip or ctx.get("ip") or "").strip() or None
-    ua2 = str(user_agent or ctx.get("user_agent") or "").strip() or None
-    merged_meta: dict[str, Any] = {}
-    try:
-        cm = ctx.get("meta")
-        if isinstance(cm, dict):
-            merged_meta.update(cm)
-    except Exception:
-        pass
-    if isinstance(meta, dict):
-        merged_meta.update(meta)
-    if not merged_meta:
-        merged_meta = None  # type: ignore[assignment]
+    # Explicit arguments win; the (uncopied) context is only consulted for missing ones.
+    ctx_get = peek_audit_context().get
+    a = str(actor or ctx_get("actor") or "system")
+    cid = candidate_id if candidate_id is not None else ctx_get("candidate_id")
+    ek = quiz_key if quiz_key is not None else ctx_get("quiz_key")
+    t = token if token is not None else ctx_get("token")
+    ip2 = str(ip or ctx_get("ip") or "").strip() or None
+    ua2 = str(user_agent or ctx_get("user_agent") or "").strip() or None
+    # Most events carry neither context meta nor explicit meta; skip the merge dict then.
+    ctx_meta = ctx_get("meta")
+    has_ctx_meta = isinstance(ctx_meta, dict) and bool(ctx_meta)
+    has_meta = isinstance(meta, dict) and bool(meta)
+    merged_meta: dict[str, Any] | None = None
+    if has_ctx_meta or has_meta:
+        merged_meta = {}
+        if has_ctx_meta:
+            merged_meta.update(ctx_meta)
+        if has_meta:
+            merged_meta.update(meta)
 
     # If the caller didn't pass token usage explicitly, try to fill it from audit meta accumulation.
     # This lets one business log row carry the total token cost of the operation.
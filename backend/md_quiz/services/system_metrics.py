@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import threading
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import Any
 
 from backend.md_quiz.config import logger
@@ -18,13 +19,56 @@ from backend.md_quiz.storage.db import (
     set_runtime_kv,
 )
 
+_ALERT_LEVELS = frozenset(("warn", "danger", "critical"))
+_ALERT_KINDS = frozenset(("llm_tokens", "sms_calls"))
+
 _LOCK = threading.Lock()
+# Thresholds are read on every SMS/LLM increment; keep a short-lived copy instead of a DB read each time.
+_CFG_CACHE_LOCK = threading.Lock()
+_CFG_CACHE: dict[str, object] = {"at": 0.0, "value": {}}
+_CFG_CACHE_TTL_SECONDS = 5.0
+# Alert state is read-modify-written per kind; SMS and LLM alerts never touch each other's rows,
+# so each kind gets its own lock instead of contending on _LOCK.
+_ALERT_LOCKS = {k: threading.Lock() for k in _ALERT_KINDS}
+# kind -> (day, level, limit) last persisted by this process; written under that kind's lock.
+_ALERT_SEEN: dict[str, tuple[str, str, int]] = {}
+
+# (day, valid_until_ts): the local day string only changes at midnight, so reuse it until then.
+_DAY_CACHE: tuple[str, float] = ("", 0.0)
+# Re-resolve at least this often anyway, so a host timezone/DST change is picked up.
+_DAY_CACHE_MAX_SECONDS = 300.0
 
 def _today_local_day() -> str:
-    return datetime.now().astimezone().date().isoformat()
-
-
-def _load_cfg() -> dict[str, int]:
+    global _DAY_CACHE
+    now_ts = time.time()
+    day, valid_until = _DAY_CACHE
+    if now_ts < valid_until:
+        return day
+    now = datetime.fromtimestamp(now_ts).astimezone()
+    next_midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    day = now.date().isoformat()
+    _DAY_CACHE = (day, min(next_midnight.timestamp(), now_ts + _DAY_CACHE_MAX_SECONDS))
+    return day
+
+
+def _load_cfg(*, force: bool = False) -> dict[str, int]:
+    """
+    Cached thresholds. The returned dict is shared with the cache: callers only read it.
+    """
+    now_ts = time.time()
+    with _CFG_CACHE_LOCK:
+        cached_at = float(_CFG_CACHE.get("at") or 0.0)
+        cached_val = _CFG_CACHE.get("value") or {}
+        if (not force) and cached_val and (now_ts - cached_at) < _CFG_CACHE_TTL_SECONDS:
+            return cached_val if isinstance(cached_val, dict) else {}
+    fresh = _read_cfg()
+    with _CFG_CACHE_LOCK:
+        _CFG_CACHE["at"] = now_ts
+        _CFG_CACHE["value"] = fresh
+    return fresh
+
+
+def _read_cfg() -> dict[str, int]:
     obj = get_runtime_kv("system_status_config") or {}
     try:
         llm = int(obj.get("llm_tokens_limit") or 0)
@@ -42,7 +86,8 @@ def _get_alert_state(*, day: str, kind: str) -> dict[str, Any]:
     k = str(kind or "").strip()
     if not d or not k:
         return {}
-    return dict(get_runtime_daily_metric_json(day=d, key=f"alert_state:{k}") or {})
+    # Freshly decoded per call, so no defensive copy.
+    return get_runtime_daily_metric_json(day=d, key=f"alert_state:{k}") or {}
 
 
 def _set_alert_state(*, day: str, kind: str, state: dict[str, Any]) -> None:
@@ -50,7 +95,7 @@ def _set_alert_state(*, day: str, kind: str, state: dict[str, Any]) -> None:
     k = str(kind or "").strip()
     if not d or not k:
         return
-    set_runtime_daily_metric_json(day=d, key=f"alert_state:{k}", value=dict(state or {}))
+    set_runtime_daily_metric_json(day=d, key=f"alert_state:{k}", value=state or {})
 
 
 def get_daily_metric(*, day: str, key: str) -> int:
@@ -58,8 +103,7 @@ def get_daily_metric(*, day: str, key: str) -> int:
     k = str(key or "").strip()
     if not d or not k:
         return 0
-    with _LOCK:
-        return int(get_runtime_daily_metric_int(day=d, key=k) or 0)
+    return int(get_runtime_daily_metric_int(day=d, key=k) or 0)
 
 
 def incr_daily_metric(*, day: str, key: str, delta: int) -> int:
@@ -71,8 +115,8 @@ def incr_daily_metric(*, day: str, key: str, delta: int) -> int:
         dd = 0
     if not d or not k or dd == 0:
         return 0
-    with _LOCK:
-        return int(incr_runtime_daily_metric_int(day=d, key=k, delta=dd) or 0)
+    # The upsert increments atomically in the DB; no process lock around the round-trip.
+    return int(incr_runtime_daily_metric_int(day=d, key=k, delta=dd) or 0)
 
 
 def set_daily_last(*, day: str, key: str, value: dict[str, Any]) -> None:
@@ -80,17 +124,18 @@ def set_daily_last(*, day: str, key: str, value: dict[str, Any]) -> None:
     k = str(key or "").strip()
     if not d or not k:
         return
-    with _LOCK:
-        set_runtime_daily_metric_json(day=d, key=k, value=dict(value or {}))
+    set_runtime_daily_metric_json(day=d, key=k, value=dict(value or {}))
 
 
-def _level_from_ratio(ratio: float) -> str:
-    r = float(ratio or 0.0)
-    if r >= 1.0:
+def _level_from_counts(used: int, limit: int) -> str:
+    # Same 70% / 90% / 100% buckets as used/limit, compared in exact integer arithmetic.
+    if used <= 0 or limit <= 0:
+        return "ok"
+    if used >= limit:
         return "critical"
-    if r >= 0.9:
+    if used * 10 >= limit * 9:
         return "danger"
-    if r >= 0.7:
+    if used * 10 >= limit * 7:
         return "warn"
     return "ok"
 
@@ -121,14 +166,24 @@ def _safe_ratio(used: int, limit: int) -> float:
 
 
 def _maybe_emit_system_alert(*, day: str, kind: str, used: int, limit: int) -> None:
-    ratio = _safe_ratio(used, limit)
-    level = _level_from_ratio(ratio)
+    u = int(used or 0)
+    lim = int(limit or 0)
+    if lim <= 0 or u <= 0:
+        # No threshold configured (the default) or nothing used: nothing to evaluate or record.
+        return
+    level = _level_from_counts(u, lim)
     d = str(day or "").strip()[:10]
     k = str(kind or "").strip()
     if not d or not k:
         return
 
-    with _LOCK:
+    with _ALERT_LOCKS.get(k, _LOCK):
+        # Same level under the same limit as last time: nothing to emit, and the stored
+        # state would only get fresher used/ratio numbers; skip both DB round-trips.
+        if _ALERT_SEEN.get(k) == (d, level, lim):
+            return
+        # The ratio is only reported in state/log payloads.
+        ratio = float(u) / float(lim)
         prev = _get_alert_state(day=d, kind=k)
         prev_level = str(prev.get("level") or "").strip()
         try:
@@ -137,18 +192,19 @@ def _maybe_emit_system_alert(*, day: str, kind: str, used: int, limit: int) -> N
             prev_limit = 0
 
         # Not exceeded: only update state, never emit.
-        if level not in {"warn", "danger", "critical"}:
+        if level not in _ALERT_LEVELS:
             _set_alert_state(
                 day=d,
                 kind=k,
                 state={
                     "level": "ok",
-                    "limit": int(limit or 0),
-                    "used": int(used or 0),
-                    "ratio": float(ratio or 0.0),
+                    "limit": lim,
+                    "used": u,
+                    "ratio": ratio,
                     "updated_at": datetime.now().astimezone().isoformat(timespec="seconds"),
                 },
             )
+            _ALERT_SEEN[k] = (d, level, lim)
             return
 
         # Exceeded:
@@ -156,41 +212,44 @@ def _maybe_emit_system_alert(*, day: str, kind: str, used: int, limit: int) -> N
         # - threshold changed and still exceeded => emit one
         # - escalated level (warn->danger->critical) => emit one
         should_emit = False
-        if prev_level not in {"warn", "danger", "critical"}:
+        if prev_level not in _ALERT_LEVELS:
             should_emit = True
-        elif int(limit or 0) != prev_limit:
+        elif lim != prev_limit:
             should_emit = True
         elif _level_rank(level) > _level_rank(prev_level):
             should_emit = True
 
-        if should_emit:
-            try:
-                create_system_log(
-                    actor="system",
-                    event_type="system.alert",
-                    meta={
-                        "day": d,
-                        "kind": k,
-                        "level": level,
-                        "used": int(used or 0),
-                        "limit": int(limit or 0),
-                        "ratio": float(ratio or 0.0),
-                    },
-                )
-            except Exception:
-                logger.exception("Failed to emit system.alert (kind=%s, level=%s)", kind, level)
-
         _set_alert_state(
             day=d,
             kind=k,
             state={
                 "level": level,
-                "limit": int(limit or 0),
-                "used": int(used or 0),
-                "ratio": float(ratio or 0.0),
+                "limit": lim,
+                "used": u,
+                "ratio": ratio,
                 "updated_at": datetime.now().astimezone().isoformat(timespec="seconds"),
             },
         )
+        _ALERT_SEEN[k] = (d, level, lim)
+
+    # The recorded state already claims this alert, so concurrent callers will not emit it
+    # again; insert the log row without holding the lock.
+    if should_emit:
+        try:
+            create_system_log(
+                actor="system",
+                event_type="system.alert",
+                meta={
+                    "day": d,
+                    "kind": k,
+                    "level": level,
+                    "used": u,
+                    "limit": lim,
+                    "ratio": ratio,
+                },
+            )
+        except Exception:
+            logger.exception("Failed to emit system.alert (kind=%s, level=%s)", kind, level)
 
 
 def incr_sms_calls_and_alert(delta: int = 1) -> int:
@@ -227,7 +286,8 @@ def emit_alerts_for_current_snapshot(*, day: str | None = None) -> None:
     d = str(day or _today_local_day()).strip()[:10]
     if not d:
         return
-    cfg = _load_cfg()
+    # Called right after threshold changes: bypass (and refresh) the cached limits.
+    cfg = _load_cfg(force=True)
     llm_limit = int(cfg.get("llm_tokens_limit") or 0)
     sms_limit = int(cfg.get("sms_calls_limit") or 0)
     llm_used = get_daily_metric(day=d, key="llm_tokens")
@@ -243,7 +303,7 @@ def backfill_missing_system_alert_levels(*, day: str, kind: str) -> int:
     """
     d = str(day or "").strip()[:10]
     k = str(kind or "").strip()
-    if not d or k not in {"llm_tokens", "sms_calls"}:
+    if not d or k not in _ALERT_KINDS:
         return 0
     used = int(get_daily_metric(day=d, key=k) or 0)
     if used <= 0:
@@ -308,10 +368,9 @@ def ensure_sms_calls_metric(*, day: str, tz_offset_seconds: int) -> int:
     d = str(day or "").strip()[:10]
     if not d:
         return 0
-    with _LOCK:
-        cur = int(get_runtime_daily_metric_int(day=d, key="sms_calls") or 0)
-        if cur > 0:
-            return cur
+    cur = int(get_runtime_daily_metric_int(day=d, key="sms_calls") or 0)
+    if cur > 0:
+        return cur
     # Query outside the lock to avoid holding it during DB I/O.
     try:
         est = int(estimate_sms_calls_for_day(day=d, tz_offset_seconds=int(tz_offset_seconds or 0)) or 0)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-import re
+from functools import lru_cache
+
+# Every char `\s` matches (i.e. str.isspace), spelled out so import does not scan code points.
+_WHITESPACE_CHARS = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005"
+    "\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+# Whitespace plus common punctuation, as one str.translate deletion table instead of a regex pass per call.
+_NORM_DELETE = str.maketrans("", "", _WHITESPACE_CHARS + "·•-\u2013\u2014\uFF0D_/，,。()（）【】[]{}")
 
 
 def _norm(s: str) -> str:
-    v = (s or "").strip().lower()
     # Remove common punctuation/whitespace so that inputs like
     # “中国石油大学（北京）” can match “中国石油大学北京”.
-    v = re.sub(r"[\s·•\-\u2013\u2014\uFF0D_/，,。()（）【】\[\]{}]+", "", v)
-    return v
+    return (s or "").lower().translate(_NORM_DELETE)
 
 
 _IVY = {
@@ -33,8 +39,6 @@ _IVY = {
     "宾夕法尼亚大学",
 }
 
-_IVY_NORM = {_norm(x) for x in _IVY}
-
 
 # 985 universities: official list (39).
 _C985_OFFICIAL = {
@@ -80,7 +84,6 @@ _C985_OFFICIAL = {
 }
 
 _C985 = _C985_OFFICIAL
-_C985_NORM = {_norm(x) for x in _C985}
 
 
 # 211 universities (non-985) from your provided list/images.
@@ -167,24 +170,26 @@ _C211_NON985 = {
 }
 
 _C211 = _C211_NON985
-_C211_NORM = {_norm(x) for x in _C211}
+
+# normalized name -> (tag, label); one probe per lookup. Filled Ivy -> 985 -> 211 with
+# setdefault so the earlier tier wins if a name ever appears in more than one list.
+_UNIV_TAGS: dict[str, tuple[str, str]] = {}
+for _names, _tag in ((_IVY, ("ivy", "常青藤")), (_C985, ("985", "985")), (_C211, ("211", "211"))):
+    for _name in _names:
+        _UNIV_TAGS.setdefault(_norm(_name), _tag)
+del _names, _tag, _name
 
 
+@lru_cache(maxsize=4096)
 def classify_university(school: str) -> tuple[str, str]:
     """
     Returns (tag, label):
     - ("ivy", "常青藤") / ("985", "985") / ("211", "211") / ("", "")
+
+    Memoized: candidate lists and bulk imports classify the same few schools over and over.
     """
     raw = (school or "").strip()
     if not raw:
         return "", ""
-
-    n = _norm(raw)
-    if n in _IVY_NORM:
-        return "ivy", "常青藤"
-    if n in _C985_NORM:
-        return "985", "985"
-    if n in _C211_NORM:
-        return "211", "211"
-    return "", ""
+    return _UNIV_TAGS.get(_norm(raw), ("", ""))
 
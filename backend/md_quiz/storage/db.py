@@ -112,8 +112,12 @@ def _candidate_query_where_clause(query: str | None) -> tuple[str, list[Any]]:
     return " WHERE (name ILIKE %s OR phone LIKE %s)", [q, q]
 
 
+# json.dumps(..., ensure_ascii=False) builds a new JSONEncoder per call; reuse one bound encoder.
+_JSON_DUMPS = json.JSONEncoder(ensure_ascii=False).encode
+
+
 def _json_param(value: Any) -> psycopg2.extras.Json:
-    return psycopg2.extras.Json(value, dumps=lambda x: json.dumps(x, ensure_ascii=False))
+    return psycopg2.extras.Json(value, dumps=_JSON_DUMPS)
 
 
 def _json_load(raw: Any) -> Any:
@@ -1027,7 +1031,7 @@ def update_candidate_resume(
     parsed_param = None
     if resume_parsed is not None:
         parsed_param = psycopg2.extras.Json(
-            resume_parsed, dumps=lambda x: json.dumps(x, ensure_ascii=False)
+            resume_parsed, dumps=_JSON_DUMPS
         )
     with conn_scope() as conn:
         with conn.cursor() as cur:
@@ -1067,7 +1071,7 @@ def update_candidate_resume_parsed(
   """
     parsed_param = None
     if resume_parsed is not None:
-        parsed_param = psycopg2.extras.Json(resume_parsed, dumps=lambda x: json.dumps(x, ensure_ascii=False))
+        parsed_param = psycopg2.extras.Json(resume_parsed, dumps=_JSON_DUMPS)
     with conn_scope() as conn:
         with conn.cursor() as cur:
             cur.execute(sql, (parsed_param, int(candidate_id)))
@@ -1124,7 +1128,7 @@ def save_assignment_record(token: str, assignment: dict[str, Any]) -> None:
             created_at_param = datetime.fromisoformat(created_at_raw.replace("Z", "+00:00"))
         except Exception:
             created_at_param = None
-    payload = psycopg2.extras.Json(assignment_obj, dumps=lambda x: json.dumps(x, ensure_ascii=False))
+    payload = psycopg2.extras.Json(assignment_obj, dumps=_JSON_DUMPS)
     sql = """
 INSERT INTO assignment_record(token, quiz_key, quiz_version_id, candidate_id, status, data, created_at, updated_at)
 VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, NOW()), NOW())
@@ -1179,7 +1183,7 @@ def create_assignment_record(token: str, assignment: dict[str, Any]) -> bool:
             created_at_param = datetime.fromisoformat(created_at_raw.replace("Z", "+00:00"))
         except Exception:
             created_at_param = None
-    payload = psycopg2.extras.Json(assignment_obj, dumps=lambda x: json.dumps(x, ensure_ascii=False))
+    payload = psycopg2.extras.Json(assignment_obj, dumps=_JSON_DUMPS)
     sql = """
 INSERT INTO assignment_record(token, quiz_key, quiz_version_id, candidate_id, status, data, created_at, updated_at)
 VALUES (%s, %s, %s, %s, %s, %s, COALESCE(%s, NOW()), NOW())
@@ -2944,7 +2948,7 @@ LIMIT 50
         low = nm.lower()
         if nm in {"已删除", "候选人"}:
             continue
-        if low.startswith("deleted_") or low.startswith("deletion_"):
+        if low.startswith(("deleted_", "deletion_")):
             continue
         return nm
     return ""
@@ -2976,7 +2980,7 @@ def create_system_log(
  """
     meta_param = None
     if meta is not None:
-        meta_param = psycopg2.extras.Json(meta, dumps=lambda x: json.dumps(x, ensure_ascii=False))
+        meta_param = psycopg2.extras.Json(meta, dumps=_JSON_DUMPS)
     with conn_scope() as conn:
         with conn.cursor() as cur:
             cur.execute(
@@ -39,3 +39,9 @@ def test_md_filter_preserves_tex_row_separators() -> None:
     assert "<br" not in rendered.lower()
     assert "= 3 \\\\" in rendered
     assert "= 4 \\\\" in rendered
+
+
+def test_protect_math_keeps_unclosed_delimiter_after_math_segment() -> None:
+    # Used to spin forever: an unclosed `$` / `$$` right after a protected segment.
+    assert _protect_math_for_markdown("$a$$b") == ("@@MATH0@@$b", [("@@MATH0@@", "$a$")])
+    assert _protect_math_for_markdown("$a$$$") == ("@@MATH0@@$$", [("@@MATH0@@", "$a$")])
@@ -21,3 +21,65 @@ class TestResumeExtractSection(unittest.TestCase):
         self.assertIn("Project A", got)
         self.assertNotIn("工作经历", got)
         self.assertNotIn("Company B", got)
+
+    def test_experience_raw_dedupes_overlapping_sections(self):
+        from backend.md_quiz.services.resume_service import extract_experience_raw
+
+        text = (
+            "工作经历\n"
+            "Company B 2022.01-至今\n"
+            "负责数据平台\n\n"
+            "项目经历\n"
+            "Project A 2024.01-2024.02\n"
+            "负责XXX\n\n"
+            "教育经历\n"
+            "本科\n"
+        )
+        got = extract_experience_raw(text)
+        self.assertEqual(got.count("Project A"), 1)
+        self.assertEqual(got.count("Company B"), 1)
+        self.assertEqual(got.count("负责XXX"), 1)
+
+    def test_experience_raw_dedupes_glued_single_line_sections(self):
+        from backend.md_quiz.services.resume_service import extract_experience_raw
+
+        text = (
+            "工作经历 北京某某科技有限公司 2020.01-至今 后端工程师 负责数据平台开发 "
+            "项目经历 数据平台 2021.01-2022.01 负责ETL 技能 Python"
+        )
+        got = extract_experience_raw(text)
+        self.assertEqual(got.count("北京某某科技有限公司"), 1)
+        self.assertEqual(got.count("负责ETL"), 1)
+
+    def test_experience_raw_dedupes_nested_sections_without_blank_lines(self):
+        from backend.md_quiz.services.resume_service import extract_experience_raw
+
+        text = (
+            "个人简历\n"
+            "工作经历\n"
+            "字节跳动 2020.01-至今\n"
+            "后端开发\n"
+            "项目经历\n"
+            "推荐系统 2021.03-2022.01\n"
+            "负责召回\n"
+            "教育经历\n"
+            "本科\n"
+        )
+        got = extract_experience_raw(text)
+        self.assertEqual(got.count("推荐系统"), 1)
+        self.assertEqual(got.count("负责召回"), 1)
+        self.assertTrue(got.startswith("字节跳动"))
+
+    def test_experience_raw_keeps_repeated_short_paragraph_in_same_section(self):
+        from backend.md_quiz.services.resume_service import extract_experience_raw
+
+        text = (
+            "项目经历\n"
+            "数据平台 2020.01-2021.02\n\n"
+            "负责ETL\n\n"
+            "报表系统 2021.03-2022.01\n\n"
+            "负责ETL调度与监控"
+        )
+        got = extract_experience_raw(text)
+        self.assertIn("\n\n负责ETL\n\n", got)
+        self.assertIn("负责ETL调度与监控", got)
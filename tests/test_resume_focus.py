@@ -26,3 +26,62 @@ class TestResumeFocus(unittest.TestCase):
         focused = focus_resume_text_for_details(text, head_chars=80, tail_chars=80, max_chars=2000)
         self.assertIn("WORK EXPERIENCE", focused)
         self.assertIn("PROJECTS", focused)
+
+    def test_focus_returns_cleaned_text_when_within_budget(self):
+        from backend.md_quiz.services.resume_service import focus_resume_text_for_details
+
+        text = "  姓名：张三\n教育经历\n本科 2016-2020\n\n\n\n\n技能\nPython  \n"
+        focused = focus_resume_text_for_details(text, head_chars=10, tail_chars=10, max_chars=2000)
+        self.assertEqual(focused, "姓名：张三\n教育经历\n本科 2016-2020\n\n\n技能\nPython")
+
+    def test_focus_windows_when_over_budget(self):
+        from backend.md_quiz.services.resume_service import focus_resume_text_for_details
+
+        text = (
+            "姓名：张三\n"
+            + ("无关内容\n" * 300)
+            + "获奖情况\n全国大学生数学建模一等奖\n"
+            + ("无关内容\n" * 300)
+        )
+        focused = focus_resume_text_for_details(
+            text,
+            head_chars=20,
+            tail_chars=20,
+            max_chars=1000,
+            window_before_lines=1,
+            window_after_lines=2,
+        )
+        self.assertLessEqual(len(focused), 1000)
+        self.assertIn("姓名：张三", focused)
+        self.assertIn("获奖情况\n全国大学生数学建模一等奖", focused)
+
+    def test_focus_last_window_keeps_merging_overlapping_hits(self):
+        from backend.md_quiz.services.resume_service import focus_resume_text_for_details
+
+        text = "项目经历\n甲\n乙\n技能：Python\n丙\n丁\n戊\n" + ("无关内容\n" * 50)
+        focused = focus_resume_text_for_details(
+            text,
+            head_chars=0,
+            tail_chars=0,
+            max_chars=100,
+            window_before_lines=0,
+            window_after_lines=3,
+            max_windows=1,
+        )
+        self.assertTrue(focused.startswith("项目经历"))
+        self.assertIn("技能：Python\n丙\n丁", focused)
+        self.assertNotIn("无关内容", focused)
+
+    def test_focus_zero_after_lines_gives_empty_window(self):
+        from backend.md_quiz.services.resume_service import focus_resume_text_for_details
+
+        text = "项目经历\n" + ("无关内容\n" * 50)
+        focused = focus_resume_text_for_details(
+            text,
+            head_chars=0,
+            tail_chars=0,
+            max_chars=100,
+            window_before_lines=0,
+            window_after_lines=0,
+        )
+        self.assertEqual(focused, "")
@@ -0,0 +1,47 @@
+import unittest
+
+
+class TestResumeIdentityFast(unittest.TestCase):
+    def test_label_name_stops_at_line_end(self):
+        from backend.md_quiz.services.resume_service import parse_resume_identity_fast
+
+        got = parse_resume_identity_fast("姓名：张三\n电话：13800138000\n")
+        self.assertEqual(got["name"], "张三")
+        self.assertEqual(got["phone"], "13800138000")
+        self.assertEqual(got["confidence"]["name"], 80)
+
+    def test_label_english_name_keeps_inner_space(self):
+        from backend.md_quiz.services.resume_service import parse_resume_identity_fast
+
+        got = parse_resume_identity_fast("Name: John Smith\nPhone: +86 13900139000\n")
+        self.assertEqual(got["name"], "John Smith")
+        self.assertEqual(got["phone"], "13900139000")
+
+    def test_label_english_name_stops_before_next_label(self):
+        from backend.md_quiz.services.resume_service import parse_resume_identity_fast
+
+        got = parse_resume_identity_fast("Name: John Smith Email: a@b.com")
+        self.assertEqual(got["name"], "John Smith")
+        got = parse_resume_identity_fast("Name: Li Lei Phone: 13800138000")
+        self.assertEqual(got["name"], "Li Lei")
+        self.assertEqual(got["phone"], "13800138000")
+
+    def test_label_english_name_needs_two_to_twenty_chars(self):
+        from backend.md_quiz.services.resume_service import parse_resume_identity_fast
+
+        got = parse_resume_identity_fast("Name: A\nPhone: 13800138000\n")
+        self.assertEqual(got["name"], "")
+        self.assertEqual(got["confidence"]["name"], 0)
+        got = parse_resume_identity_fast("Name: " + "A" * 30 + "\n")
+        self.assertEqual(got["name"], "")
+
+    def test_fallback_to_name_only_line(self):
+        from backend.md_quiz.services.resume_service import parse_resume_identity_fast
+
+        got = parse_resume_identity_fast("个人简历\n李四\n求职意向：后端开发\n")
+        self.assertEqual(got["name"], "李四")
+        self.assertEqual(got["phone"], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -85,3 +85,14 @@ class TestResumeProjectSplit(unittest.TestCase):
         self.assertIn("某某公司 实施顾问", titles[0])
         self.assertIn("山东工大投资有限公司用友财务系统", titles)
         self.assertIn("武汉江丰华世集团下汇丰银联易贷咨询服务", titles)
+
+    def test_split_result_is_not_shared_between_calls(self):
+        from backend.md_quiz.services.resume_service import split_projects_raw_into_blocks
+
+        raw = "项目经历\n数据平台建设 2020.01-2021.02\n负责：调度与监控\n"
+        first = split_projects_raw_into_blocks(raw)
+        first[0]["title"] = "changed"
+        first.append({})
+        second = split_projects_raw_into_blocks(raw)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(second[0]["title"], "数据平台建设")
@@ -0,0 +1,28 @@
+from backend.md_quiz.services.university_tags import classify_university
+
+
+def test_classify_university_tiers() -> None:
+    assert classify_university("Harvard University") == ("ivy", "常青藤")
+    assert classify_university("哈佛大学") == ("ivy", "常青藤")
+    assert classify_university("清华大学") == ("985", "985")
+    assert classify_university("西藏大学") == ("211", "211")
+
+
+def test_classify_university_normalizes_spacing_and_punctuation() -> None:
+    assert classify_university("  University of Pennsylvania ") == ("ivy", "常青藤")
+    assert classify_university("北京 大学") == ("985", "985")
+
+
+def test_classify_university_unknown_or_empty() -> None:
+    assert classify_university("") == ("", "")
+    assert classify_university("   ") == ("", "")
+    assert classify_university("某某职业技术学院") == ("", "")
+
+
+def test_norm_strips_every_unicode_whitespace() -> None:
+    import sys
+
+    from backend.md_quiz.services.university_tags import _norm
+
+    spaces = "".join(chr(i) for i in range(sys.maxunicode + 1) if chr(i).isspace())
+    assert _norm(f"清华{spaces}大学") == "清华大学"